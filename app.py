@@ -1,24 +1,49 @@
 import streamlit as st
-import google.generativeai as genai
 import json
+import os
 import random
-import pandas as pd
-import re
 import time
+import uuid
+from concurrent.futures import Future
+from functools import partial
 from prompts import *
 import database
+import metrics
+from fake_llm import FakeLLM
+from llm_cache import LLMCache
+from llm_client import LLMClient, LLMError
+from evaluation_queue import EvaluationPool, EvaluationQueue
+from question_bank import get_question_bank
+from session_log import SessionLog, find_open_session, load_events, replay
+from scoring import REFERENCE_FIELDS, ReferenceIndex
+from grading import EVALUATION_TIMEOUT, grade_answer
+from response_parsing import default_transition, extract_name_locally, parse_introduction_response
 from components.interview_card import show_interview_card
-from components.proctoring import ProctoringProcessor
-from streamlit_webrtc import webrtc_streamer, WebRtcMode
+from components.model_warmup import get_detector_warmup
 
 # --- MAJOR SETTING: MOCK API MODE ---
-MOCK_API_CALLS = False
+MOCK_API_CALLS = os.environ.get("MOCK_API_CALLS") == "1"
 # ------------------------------------
 
-# --- Initialize Database ---
+# Treats the camera as always on and opens no WebRTC stream; the load-test
+# harness (benchmarks/load_test.py) feeds ProctoringProcessor itself
+SIMULATED_CAMERA = os.environ.get("SIMULATED_CAMERA") == "1"
+
+# --- Initialize Database (no-op after the first run in this process) ---
 database.init_db()
 # ---------------------------
 
+# Start loading the proctoring detector in the background; the camera waits for it
+get_detector_warmup()
+
+# Prometheus metrics on 127.0.0.1:METRICS_PORT/metrics, started once per process
+metrics.start_metrics_server()
+
+# When TRACE_DIR is set, interviews where the candidate waited more than
+# SLOW_INTERVIEW_SECONDS in total get their per-step trace written there
+TRACE_DIR = os.environ.get("TRACE_DIR")
+SLOW_INTERVIEW_SECONDS = float(os.environ.get("SLOW_INTERVIEW_SECONDS", 60))
+
 st.set_page_config(layout="wide")
 
 
@@ -29,28 +54,29 @@ def load_css():
 load_css()
 
 
+FALLBACK_GREETING = "Hello, I'm Alex, your AI interviewer. Today's interview will test your Excel skills. Please start by briefly introducing yourself."
+
 TRANSITION_PHRASES = [
     "Alright, next question for you.", "Okay, let's move on to the next one.",
     "Here is your next question.", "Let's try this one.", "Okay, moving on."
 ]
 
-if not MOCK_API_CALLS:
-    try:
-        genai.configure(api_key=st.secrets["GOOGLE_API_KEY"])
-        model = genai.GenerativeModel(
-            model_name="gemini-1.5-flash", system_instruction=INTERVIEWER_PERSONA
-        )
-    except (KeyError, ValueError):
-        st.error("🚨 Error: GOOGLE_API_KEY not found. Please add it to your secrets.", icon="🚨")
-        st.stop()
+MODEL_NAME = "gemini-1.5-flash"
+
+# Requests per minute allowed by our Gemini quota
+LLM_REQUESTS_PER_MINUTE = int(os.environ.get("LLM_REQUESTS_PER_MINUTE", 60))
 
 def initialize_session_state():
     if "page" not in st.session_state:
         st.session_state.page = "LOGIN"
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
     if "user_details" not in st.session_state:
         st.session_state.user_details = None
     if "messages" not in st.session_state:
         st.session_state.messages = []
+    if "typed_message_ids" not in st.session_state:
+        st.session_state.typed_message_ids = set()
     if "stage" not in st.session_state:
         st.session_state.stage = "AWAITING_START"
     if "start_time" not in st.session_state:
@@ -61,44 +87,270 @@ def initialize_session_state():
         st.session_state.question_index = 0
     if "evaluations" not in st.session_state:
         st.session_state.evaluations = []
+    if "evaluation_queue" not in st.session_state:
+        st.session_state.evaluation_queue = None
+    if "final_summary_future" not in st.session_state:
+        st.session_state.final_summary_future = None
+    if "final_summary" not in st.session_state:
+        st.session_state.final_summary = None  # (evaluations_hash, summary)
+    if "result_id" not in st.session_state:
+        st.session_state.result_id = None
+    if "final_summary_saved" not in st.session_state:
+        st.session_state.final_summary_saved = False
+    if "candidate_name" not in st.session_state:
+        st.session_state.candidate_name = "Candidate"
     if "original_answer" not in st.session_state:
         st.session_state.original_answer = ""
+    if "question_asked_at" not in st.session_state:
+        st.session_state.question_asked_at = None
+    if "answer_latency" not in st.session_state:
+        st.session_state.answer_latency = None
     if "psych_question_count" not in st.session_state:
         st.session_state.psych_question_count = 0
     if "last_psych_question" not in st.session_state:
         st.session_state.last_psych_question = ""
     if "camera_active" not in st.session_state:
         st.session_state.camera_active = False
-    if "last_warning" not in st.session_state:
-        st.session_state.last_warning = "Status: OK"
+    if "violations" not in st.session_state:
+        st.session_state.violations = []
     if "show_warning_dialog" not in st.session_state:
         st.session_state.show_warning_dialog = False
     if "warning_count" not in st.session_state:
         st.session_state.warning_count = 0    
     # -----------------------------------------------------------
 
+# One event log writer per process; it batches every session's events into few commits
+@st.cache_resource
+def get_session_log():
+    return SessionLog()
+
+def log_event(kind, payload):
+    """Appends an event to this interview's crash-recovery log."""
+    get_session_log().append(st.session_state.session_id, st.session_state.user_details['userid'], kind, payload)
+
+# Small state that replay() restores from the latest progress event
+PROGRESS_FIELDS = [
+    "stage", "question_index", "candidate_name", "psych_question_count", "last_psych_question",
+    "original_answer", "question_asked_at", "answer_latency",
+]
+
+def checkpoint():
+    """Logs the interview's progress after a step, so it can be resumed from here."""
+    log_event("progress", {field: st.session_state[field] for field in PROGRESS_FIELDS})
+
 def type_effect(text):
     for word in text.split():
         yield word + " "
 
+def add_message(role, content, typed=False):
+    """Appends a chat message with a stable id used to play its type effect only once.
+
+    Pass typed=True for messages that were already streamed into the chat.
+    """
+    message_id = len(st.session_state.messages)
+    st.session_state.messages.append({"id": message_id, "role": role, "content": content})
+    log_event("message", {"role": role, "content": content})
+    if typed:
+        st.session_state.typed_message_ids.add(message_id)
+
+def stream_text(response):
+    """Yields the text of each chunk of a stream=True response."""
+    for chunk in response:
+        try:
+            yield chunk.text
+        except ValueError:
+            # Chunks without text parts (e.g. safety metadata only)
+            continue
+
+def generate_stream(prompt, prompt_type, cacheable=True):
+    """Starts a streamed LLM call for this session.
+
+    With cacheable=False the response cache is bypassed even if prompt_type opts in.
+    """
+    return llm.generate(prompt, prompt_type, session_id=st.session_state.session_id, stream=True, cacheable=cacheable)
+
+def stream_assistant_message(prompt, prompt_type, fallback, cacheable=True):
+    """Streams the model's reply into a new assistant bubble as it arrives and records it.
+
+    If the model cannot be reached, or the stream breaks off, the fallback text is used instead.
+    """
+    try:
+        response = generate_stream(prompt, prompt_type, cacheable)
+    except LLMError as e:
+        print(f"{prompt_type} call failed, using fallback: {e}")
+        add_message("assistant", fallback)
+        return fallback
+    with st.chat_message("assistant"):
+        placeholder = st.empty()
+        try:
+            with placeholder:
+                text = st.write_stream(stream_text(response))
+        except LLMError as e:
+            print(f"{prompt_type} stream failed, using fallback: {e}")
+            placeholder.markdown(fallback)
+            text = fallback
+    add_message("assistant", text, typed=True)
+    return text
+
+def render_chat_history():
+    """Renders the transcript; only messages that have never been shown get the type effect."""
+    for message in st.session_state.messages:
+        with st.chat_message(message["role"]):
+            if message["role"] == "assistant" and message["id"] not in st.session_state.typed_message_ids:
+                # Mark first so an interrupted rerun never replays the effect
+                st.session_state.typed_message_ids.add(message["id"])
+                st.write_stream(type_effect(message["content"]))
+            else:
+                st.markdown(message["content"])
+
 def select_questions():
-    all_questions = json.load(open("questions.json"))
-    easy_q, mid_q, hard_q = [q for q in all_questions if q['level'] == 'easy'], [q for q in all_questions if q['level'] == 'mid'], [q for q in all_questions if q['level'] == 'hard']
-    selected_questions = random.sample(hard_q, 2) + random.sample(easy_q + mid_q, 8)
-    random.shuffle(selected_questions)
-    return selected_questions
+    """2 hard and 8 easy/mid questions across as many topics as possible, preferring ones the user hasn't seen."""
+    seen_ids = database.asked_question_ids(st.session_state.user_details['userid'])
+    return get_question_bank().select(exclude_ids=seen_ids)
+
+# Latency and error rate come from the FAKE_LLM_* environment variables
+@st.cache_resource
+def get_fake_llm():
+    return FakeLLM.from_env()
 
 def generate_mock_content(prompt_type):
-    time.sleep(0.5)
-    class MockResponse:
-        def __init__(self, text): self.text = text
-    if prompt_type == "GREETING": return MockResponse("Hello, I am Alex, an AI interviewer. Please introduce yourself.")
-    if prompt_type == "NAME_EXTRACTION": return MockResponse(st.session_state.user_details['name'])
-    if prompt_type == "TRANSITION_TO_QUESTIONS": return MockResponse(f"Thank you, {st.session_state.user_details['name']}. Let's begin.")
-    if prompt_type == "EVALUATION": return MockResponse('{"score": 3, "feedback": "This is mock feedback."}')
-    if prompt_type == "PSYCH_RESPONSE_TRANSITION": return MockResponse("Okay, noted. Let's review.")
-    if prompt_type == "FINAL_SUMMARY": return MockResponse("This is a mock summary.")
-    return MockResponse("This is a generic mock response.")
+    if prompt_type == "INTRODUCTION":
+        name = st.session_state.user_details['name']
+        return get_fake_llm()(prompt_type, json.dumps({"name": name, "transition": f"Thank you, {name}. Let's begin."}))
+    return get_fake_llm()(prompt_type)
+
+# One LLM client per process, so connections, limits and the response cache are shared by every session
+@st.cache_resource
+def get_llm_client():
+    if MOCK_API_CALLS:
+        return LLMClient(mock=generate_mock_content, requests_per_minute=LLM_REQUESTS_PER_MINUTE)
+    import google.generativeai as genai
+    genai.configure(api_key=st.secrets["GOOGLE_API_KEY"])
+    return LLMClient(
+        model=genai.GenerativeModel(model_name=MODEL_NAME, system_instruction=INTERVIEWER_PERSONA),
+        cache=LLMCache(), model_name=MODEL_NAME, system_instruction=INTERVIEWER_PERSONA,
+        requests_per_minute=LLM_REQUESTS_PER_MINUTE,
+    )
+
+def require_llm_client():
+    """Returns the LLM client, stopping the script run with an error if the API key is missing."""
+    try:
+        return get_llm_client()
+    except (KeyError, ValueError):
+        st.error("🚨 Error: GOOGLE_API_KEY not found. Please add it to your secrets.", icon="🚨")
+        st.stop()
+
+# The client (and google.generativeai) is only needed once past the login page
+if st.session_state.get("page", "LOGIN") != "LOGIN":
+    llm = require_llm_client()
+
+# One pool of evaluation workers shared by every session in the process
+@st.cache_resource
+def get_evaluation_pool():
+    return EvaluationPool()
+
+# TF-IDF index over the reference answers in questions.json, built once per process
+@st.cache_resource
+def get_reference_index():
+    with open("questions.json") as f:
+        return ReferenceIndex(json.load(f))
+
+def evaluate_answer(llm_client, question_data, answer, session_id=None):
+    """Grades one answer. Runs on an evaluation pool thread, so it must not use st.session_state or the module-level llm."""
+    return grade_answer(llm_client, question_data, answer, get_reference_index(), session_id=session_id)
+
+def create_evaluation_queue():
+    """Returns a new evaluation queue for this session that logs each evaluation as soon as it is graded."""
+    session_id, userid = st.session_state.session_id, st.session_state.user_details['userid']
+    session_log = get_session_log()
+    # The LLM client retries transport errors and evaluate_answer repairs bad replies
+    return EvaluationQueue(
+        get_evaluation_pool(), partial(evaluate_answer, require_llm_client(), session_id=session_id), retries=0,
+        omit_fields=REFERENCE_FIELDS,
+        on_result=lambda evaluation: session_log.append(session_id, userid, "evaluation", evaluation)
+    )
+
+def resume_interview(userid):
+    """Rebuilds the user's unfinished interview from its event log. Returns True if there was one."""
+    session_log = get_session_log()
+    session_log.flush()
+    session_id = find_open_session(userid)
+    if session_id is None:
+        return False
+    state = replay(load_events(session_id))
+    pending_answers = state.pop("pending_answers")
+    for key, value in state.items():
+        st.session_state[key] = value
+    st.session_state.session_id = session_id
+    st.session_state.typed_message_ids = {message["id"] for message in st.session_state.messages}
+    st.session_state.evaluation_queue = create_evaluation_queue()
+    # Answers that were still being graded when the session was lost
+    for question_data, answer in pending_answers:
+        st.session_state.evaluation_queue.submit(question_data, answer)
+    print(f"Resumed interview {session_id} for {userid} ({len(pending_answers)} answers regraded).")
+    return True
+
+def dump_trace_if_slow():
+    """Writes this interview's trace to TRACE_DIR if the candidate's total wait was slow, then drops it."""
+    session_id = st.session_state.session_id
+    trace = metrics.session_traces.get(session_id)
+    waited = sum(step["seconds"] for step in trace if step["name"] == "turn_seconds")
+    if TRACE_DIR and waited > SLOW_INTERVIEW_SECONDS:
+        os.makedirs(TRACE_DIR, exist_ok=True)
+        path = os.path.join(TRACE_DIR, f"{session_id}.json")
+        metrics.dump_session_trace(session_id, path)
+        print(f"Slow interview ({waited:.1f}s waiting), trace written to {path}.")
+    else:
+        metrics.session_traces.pop(session_id)
+
+def merge_finished_evaluations(wait=False):
+    """Moves finished background evaluations into st.session_state.evaluations, in question order."""
+    queue = st.session_state.evaluation_queue
+    if queue is None:
+        return
+    st.session_state.evaluations.extend(queue.wait() if wait else queue.pop_ready())
+
+def generate_final_summary(llm_client, evaluations):
+    """Asks the model for the final report on evaluations. Safe to call from a pool thread."""
+    summary_prompt = FINAL_REPORT_PROMPT_TEMPLATE.format(evaluations=json.dumps(evaluations))
+    return llm_client.generate(summary_prompt, "FINAL_SUMMARY").text
+
+def prefetch_final_summary():
+    """Starts writing the final summary in the background as soon as the last answer is graded.
+
+    The future resolves to (evaluations_hash, summary).
+    """
+    future = Future()
+    st.session_state.final_summary_future = future
+    llm_client = require_llm_client()
+
+    def summarize(evaluations):
+        try:
+            future.set_result((database.evaluations_hash(evaluations), generate_final_summary(llm_client, evaluations)))
+        except Exception as e:
+            future.set_exception(e)
+
+    st.session_state.evaluation_queue.on_complete(summarize)
+
+def get_ready_final_summary(wait=False):
+    """Returns the memoized or prefetched summary for the current evaluations, or None if there is none."""
+    key = database.evaluations_hash(st.session_state.evaluations)
+    if st.session_state.final_summary and st.session_state.final_summary[0] == key:
+        return st.session_state.final_summary[1]
+
+    future = st.session_state.final_summary_future
+    if future is None or not (wait or future.done()):
+        return None
+    try:
+        summary_key, summary = future.result(timeout=EVALUATION_TIMEOUT)
+    except Exception as e:
+        print(f"Final summary prefetch failed: {e}")
+        return None
+    # The prefetch only counts if it summarized exactly these evaluations
+    if summary_key != key:
+        return None
+    st.session_state.final_summary = (key, summary)
+    return summary
 
 def render_login_page():
     st.title("AI Excel Interviewer Login")
@@ -111,6 +363,8 @@ def render_login_page():
             user_details = database.verify_user(userid, password)
             if user_details:
                 st.session_state.user_details = user_details
+                if resume_interview(user_details['userid']):
+                    st.toast("Welcome back! Your interview has been restored.")
                 st.session_state.page = "INTERVIEW"
                 st.rerun()
             else:
@@ -119,6 +373,8 @@ def render_login_page():
 # --- UPDATED: This function is now completely replaced ---
 
 def render_interview_page():
+    merge_finished_evaluations()
+
     # Create three equal-width columns
     col1, col2, col3 = st.columns([1, 1.5, 1])
     
@@ -140,37 +396,43 @@ def render_interview_page():
         # Create a container with a fixed height for the chat history
         chat_container = st.container(height=500, border=False)
         with chat_container:
-            for i, message in enumerate(st.session_state.messages):
-                with st.chat_message(message["role"]):
-                    # If it's the last message from the assistant, apply the effect
-                    if message["role"] == "assistant" and i == len(st.session_state.messages) - 1:
-                        st.write_stream(type_effect(message["content"]))
-                    else:
-                        st.markdown(message["content"])
+            render_chat_history()
 
         # Start button and chat input are below the chat history
         if st.session_state.stage == "AWAITING_START":
             if st.button("Start Interview", use_container_width=True, key="start_button"):
                 st.session_state.stage = "BOT_INTRODUCTION"
                 st.session_state.questions = select_questions()
+                st.session_state.evaluation_queue = create_evaluation_queue()
                 st.session_state.start_time = time.time()
-                if MOCK_API_CALLS:
-                    response = generate_mock_content("GREETING")
-                else:
-                    response = model.generate_content(GREETING_PROMPT)
-                st.session_state.messages.append({"role": "assistant", "content": response.text})
+                log_event("started", {"questions": st.session_state.questions, "start_time": st.session_state.start_time})
+                with chat_container, metrics.timed("turn_seconds", st.session_state.session_id, stage="GREETING"):
+                    stream_assistant_message(GREETING_PROMPT, "GREETING", fallback=FALLBACK_GREETING)
+                checkpoint()
                 st.rerun()
 
         if st.session_state.stage == "INTERVIEW_COMPLETE":
             if st.button("Submit and See Evaluation", use_container_width=True, key="submit_button"):
-                database.save_interview_results(
+                # Only the answers still being graded are waited on
+                with st.spinner("Finishing your evaluation..."), metrics.timed("turn_seconds", st.session_state.session_id, stage="SUBMIT"):
+                    merge_finished_evaluations(wait=True)
+                final_summary = get_ready_final_summary()
+                # Every step is already in the event log; this only writes the results and closes it
+                get_session_log().flush()
+                st.session_state.result_id = database.save_interview_results(
                     userid=st.session_state.user_details['userid'],
                     evaluations=st.session_state.evaluations,
-                    warning_count=st.session_state.warning_count
+                    warning_count=st.session_state.warning_count,
+                    final_summary=final_summary,
+                    session_id=st.session_state.session_id
                 )
+                st.session_state.final_summary_saved = final_summary is not None
+                dump_trace_if_slow()
                 st.session_state.page = "EVALUATION"
                 st.rerun()    
 
+        if SIMULATED_CAMERA:
+            st.session_state.camera_active = True
         is_interview_running = st.session_state.stage not in ["AWAITING_START", "INTERVIEW_COMPLETE"]
         chat_disabled = not st.session_state.camera_active and is_interview_running
 
@@ -178,8 +440,14 @@ def render_interview_page():
             st.info("Please enable your camera on the right to activate the answer box.")
 
         if prompt := st.chat_input("Your answer...", disabled=chat_disabled):
-            st.session_state.messages.append({"role": "user", "content": prompt})
-            handle_user_response(prompt)
+            add_message("user", prompt)
+            # Show the answer right away; replies are streamed in below it
+            with chat_container:
+                with st.chat_message("user"):
+                    st.markdown(prompt)
+                with metrics.timed("turn_seconds", st.session_state.session_id, "Time a candidate waits per step", stage=st.session_state.stage):
+                    handle_user_response(prompt)
+            checkpoint()
             st.rerun()
 
     # --- CAMERA AND PROCTORING (Right Column) ---
@@ -190,7 +458,13 @@ def render_interview_page():
             st.warning("Camera must remain on. Turning it off will terminate the interview.", icon="❗")
 
         ctx = None
-        if st.session_state.stage != "AWAITING_START":
+        if SIMULATED_CAMERA:
+            st.info("Simulated camera: proctoring is driven by the load-test harness.")
+        elif st.session_state.stage != "AWAITING_START" and not get_detector_warmup().ready:
+            render_detector_loading()
+        elif st.session_state.stage != "AWAITING_START":
+            from components.proctoring import ProctoringProcessor
+            from streamlit_webrtc import webrtc_streamer, WebRtcMode
             ctx = webrtc_streamer(
                 key="proctoring",
                 mode=WebRtcMode.SENDRECV,
@@ -199,50 +473,63 @@ def render_interview_page():
                 async_processing=True,
             )
             
-            is_camera_playing = ctx is not None and ctx.state.playing
-            interview_in_progress = st.session_state.stage not in ["AWAITING_START", "INTERVIEW_COMPLETE"]
+            render_proctoring_status(ctx)
 
-            if interview_in_progress and st.session_state.camera_active and not is_camera_playing:
-                st.session_state.page = "TERMINATED_CAMERA"
-                st.rerun()
+@st.fragment(run_every=1)
+def render_detector_loading():
+    """Shown in place of the camera until the detector has warmed up; reruns the page once it has."""
+    warmup = get_detector_warmup()
+    if warmup.ready:
+        st.rerun()
+    elif warmup.status == "failed":
+        st.error("Proctoring could not be started. Please contact support.", icon="🚨")
+    else:
+        st.info("Preparing the proctoring camera...", icon="⏳")
 
-            if is_camera_playing != st.session_state.camera_active:
-                st.session_state.camera_active = is_camera_playing
-                st.rerun()
+@st.fragment(run_every=1)
+def render_proctoring_status(ctx):
+    """Polls the camera and proctoring state once a second without rerunning the whole page.
+
+    A full rerun is only triggered when the camera state changes or the interview is terminated.
+    """
+    metrics.counter("streamlit_fragment_runs_total", "Proctoring status polls").inc()
+    is_camera_playing = ctx is not None and ctx.state.playing
+    interview_in_progress = st.session_state.stage not in ["AWAITING_START", "INTERVIEW_COMPLETE"]
+
+    if interview_in_progress and st.session_state.camera_active and not is_camera_playing:
+        database.close_session(st.session_state.session_id, st.session_state.user_details['userid'], "terminated", {"reason": "camera"})
+        st.session_state.page = "TERMINATED_CAMERA"
+        st.rerun()
 
-            if ctx and ctx.video_processor:
-                current_warning = ctx.video_processor.warning_message
-                
-                # New Status Display Logic in a container
-                with st.container(border=True):
-                    if "Warning" in current_warning:
-                        st.error(f"**Status:** {current_warning}", icon="🚨")
-                    else:
-                        st.success(f"**Status:** {current_warning}", icon="✅")
-                    
-                    # Use st.metric for a visually appealing warning counter
-                    st.metric(label="Warnings", value=f"{st.session_state.warning_count} / 3")
-
-
-                is_malpractice = "Warning:" in current_warning
-                if is_malpractice and current_warning != st.session_state.last_warning:
-                    st.toast(f"🚨 {current_warning} 🚨", icon="⚠️")
-                    st.session_state.last_warning = current_warning
-                    st.session_state.warning_count += 1
-
-                    if st.session_state.warning_count >= 3:
-                        st.session_state.page = "TERMINATED"
-                        st.rerun()
-
-                elif not is_malpractice and st.session_state.last_warning != "Status: OK":
-                    st.session_state.last_warning = "Status: OK"
-                    
-    # Timer update logic should be outside the columns
-    if st.session_state.stage not in ["AWAITING_START", "INTERVIEW_COMPLETE"]:
-        # Rerun every second to update the timer
-        time.sleep(1)
+    if is_camera_playing != st.session_state.camera_active:
+        st.session_state.camera_active = is_camera_playing
         st.rerun()
 
+    if ctx and ctx.video_processor:
+        # Each debounced violation event costs one strike
+        for event in ctx.video_processor.pop_violation_events():
+            st.toast(f"🚨 {event['message']} 🚨", icon="⚠️")
+            st.session_state.violations.append(event)
+            st.session_state.warning_count += 1
+            log_event("violation", event)
+
+        if st.session_state.warning_count >= 3:
+            database.close_session(st.session_state.session_id, st.session_state.user_details['userid'], "terminated", {"reason": "warnings"})
+            st.session_state.page = "TERMINATED"
+            st.rerun()
+
+        current_warning = ctx.video_processor.warning_message
+
+        # New Status Display Logic in a container
+        with st.container(border=True):
+            if "Warning" in current_warning:
+                st.error(f"**Status:** {current_warning}", icon="🚨")
+            else:
+                st.success(f"**Status:** {current_warning}", icon="✅")
+
+            # Use st.metric for a visually appealing warning counter
+            st.metric(label="Warnings", value=f"{st.session_state.warning_count} / 3")
+
 def render_evaluation_page():
     st.title("📈 Interview Performance Evaluation")
     if MOCK_API_CALLS: st.warning("Displaying MOCK evaluation data.", icon="⚠️")
@@ -263,18 +550,33 @@ def render_evaluation_page():
         st.metric("Proctoring Warnings", st.session_state.warning_count)
     st.divider() 
     
-    with st.spinner("Generating final summary..."):
-        if MOCK_API_CALLS: summary_response = generate_mock_content("FINAL_SUMMARY")
-        else:
-            eval_json_str = json.dumps(st.session_state.evaluations)
-            summary_prompt = FINAL_REPORT_PROMPT_TEMPLATE.format(evaluations=eval_json_str)
-            summary_response = model.generate_content(summary_prompt)
-        st.subheader("Overall Summary")
-        st.markdown(summary_response.text)
+    st.subheader("Overall Summary")
+    if st.session_state.final_summary_future is not None and not st.session_state.final_summary_future.done():
+        with st.spinner("Generating final summary..."):
+            summary = get_ready_final_summary(wait=True)
+    else:
+        summary = get_ready_final_summary()
+
+    if summary is not None:
+        st.markdown(summary)
+    else:
+        # Nothing was prefetched for these evaluations; generate once and remember it
+        eval_json_str = json.dumps(st.session_state.evaluations)
+        summary_prompt = FINAL_REPORT_PROMPT_TEMPLATE.format(evaluations=eval_json_str)
+        try:
+            summary = st.write_stream(stream_text(generate_stream(summary_prompt, "FINAL_SUMMARY")))
+            st.session_state.final_summary = (database.evaluations_hash(st.session_state.evaluations), summary)
+        except LLMError:
+            st.error("The summary could not be generated right now. Please refresh the page to try again.")
+
+    if summary is not None and st.session_state.result_id is not None and not st.session_state.final_summary_saved:
+        database.save_final_summary(st.session_state.result_id, summary)
+        st.session_state.final_summary_saved = True
     st.subheader("Detailed Breakdown")
     df_data = []
     for i, eval_item in enumerate(st.session_state.evaluations):
         df_data.append({"Question #": i + 1, "Topic": eval_item["topic"], "Your Score (out of 5)": eval_item["score"], "Feedback": eval_item["feedback"]})
+    import pandas as pd
     df = pd.DataFrame(df_data)
 
     def style_scores(score):
@@ -323,16 +625,20 @@ def handle_user_response(prompt):
     elif current_stage == "AWAITING_PSYCH_RESPONSE": handle_psych_response(prompt)
 
 def handle_introduction_and_transition(introduction_text):
+    # Name extraction and the transition come back together as one JSON reply
     with st.spinner("..."):
-        if MOCK_API_CALLS:
-            name_response = generate_mock_content("NAME_EXTRACTION")
-            transition_response = generate_mock_content("TRANSITION_TO_QUESTIONS")
-        else:
-            name_prompt = NAME_EXTRACTION_PROMPT_TEMPLATE.format(introduction=introduction_text)
-            name_response = model.generate_content(name_prompt)
-            transition_prompt = TRANSITION_TO_QUESTIONS_PROMPT_TEMPLATE.format(name=name_response.text.strip())
-            transition_response = model.generate_content(transition_prompt)
-        st.session_state.messages.append({"role": "assistant", "content": transition_response.text})
+        try:
+            prompt = INTRODUCTION_PROMPT_TEMPLATE.format(introduction=introduction_text)
+            response = llm.generate(
+                prompt, "INTRODUCTION", session_id=st.session_state.session_id,
+                generation_config={"response_mime_type": "application/json"}
+            )
+            introduction = parse_introduction_response(response.text)
+        except (ValueError, LLMError):
+            name = extract_name_locally(introduction_text)
+            introduction = {"name": name, "transition": default_transition(name)}
+    st.session_state.candidate_name = introduction["name"]
+    add_message("assistant", introduction["transition"])
     ask_next_question()
 
 def ask_next_question():
@@ -340,57 +646,46 @@ def ask_next_question():
     if idx < len(st.session_state.questions):
         question = st.session_state.questions[idx]['question']
         transition = random.choice(TRANSITION_PHRASES)
-        st.session_state.messages.append({"role": "assistant", "content": f"{transition}\n\n{question}"})
+        add_message("assistant", f"{transition}\n\n{question}")
         st.session_state.stage = "AWAITING_ANSWER"
+        st.session_state.question_asked_at = time.time()
     else:
         st.session_state.stage = "INTERVIEW_COMPLETE"
-        st.session_state.messages.append({"role": "assistant", "content": "That was the final question. Please click the 'Submit' button."})
+        add_message("assistant", "That was the final question. Please click the 'Submit' button.")
+        prefetch_final_summary()
 
 def handle_main_answer(answer):
     question_data = st.session_state.questions[st.session_state.question_index]
+    # Seconds from the question appearing to the first answer, stored with the evaluation
+    if st.session_state.question_asked_at is not None:
+        st.session_state.answer_latency = round(time.time() - st.session_state.question_asked_at, 2)
     if (question_data['level'] in ['mid', 'hard'] and st.session_state.psych_question_count < 4):
         st.session_state.original_answer, st.session_state.stage = answer, "AWAITING_PSYCH_RESPONSE"
         psych_question = random.choice(PSYCHOLOGICAL_QUESTIONS)
         st.session_state.last_psych_question = psych_question
         st.session_state.psych_question_count += 1
-        st.session_state.messages.append({"role": "assistant", "content": psych_question})
+        add_message("assistant", psych_question)
     else:
         perform_evaluation(answer)
 
 def handle_psych_response(psych_response):
-    with st.spinner("..."):
-        if MOCK_API_CALLS:
-            transition_response = generate_mock_content("PSYCH_RESPONSE_TRANSITION")
-        else:
-            prompt = PSYCH_RESPONSE_TRANSITION_PROMPT_TEMPLATE.format(psych_question=st.session_state.last_psych_question, psych_response=psych_response)
-            transition_response = model.generate_content(prompt)
-        st.session_state.messages.append({"role": "assistant", "content": transition_response.text})
+    prompt = PSYCH_RESPONSE_TRANSITION_PROMPT_TEMPLATE.format(psych_question=st.session_state.last_psych_question, psych_response=psych_response)
+    # Only short, common replies ("yes", "I'm sure") are worth caching
+    is_short_reply = len(psych_response.split()) <= 4
+    stream_assistant_message(prompt, "PSYCH_RESPONSE_TRANSITION", fallback="Okay, noted.", cacheable=is_short_reply)
     perform_evaluation(st.session_state.original_answer)
 
 def perform_evaluation(answer):
-    idx = st.session_state.question_index
-    question_data = st.session_state.questions[idx]
-    with st.spinner("..."):
-        try:
-            if MOCK_API_CALLS: response = generate_mock_content("EVALUATION")
-            else:
-                prompt = EVALUATION_PROMPT_TEMPLATE.format(question=question_data['question'], answer=answer)
-                response = model.generate_content(prompt)
-            text_response = response.text
-            match = re.search(r"```json\s*(\{.*?\})\s*```", text_response, re.DOTALL)
-            json_str = match.group(1) if match else text_response.strip()
-            evaluation = json.loads(json_str)
-            eval_data = {**question_data, **evaluation}
-            st.session_state.evaluations.append(eval_data)
-            conversational_feedback = evaluation.get("feedback", "Okay, noted.")
-            st.session_state.messages.append({"role": "assistant", "content": conversational_feedback})
-        except (json.JSONDecodeError, AttributeError, KeyError) as e:
-            st.warning("Sorry, there was an issue processing that response. Let's move on.")
-        finally:
-            st.session_state.question_index += 1
-            ask_next_question()
+    # Grading happens in the background; the next question is asked right away
+    question_data = st.session_state.questions[st.session_state.question_index]
+    question_data = {**question_data, "answer_latency": st.session_state.answer_latency}
+    log_event("answer", {"question": question_data, "answer": answer})
+    st.session_state.evaluation_queue.submit(question_data, answer)
+    st.session_state.question_index += 1
+    ask_next_question()
 
 initialize_session_state()
+metrics.counter("streamlit_reruns_total", "Full script runs by page").inc(page=st.session_state.page)
 if st.session_state.page == "LOGIN":
     render_login_page()
 elif 'user_details' in st.session_state and st.session_state.user_details:
@@ -0,0 +1,92 @@
+# benchmarks/bench_cold_start.py
+"""Cold-start cost of a fresh app process.
+
+1. Import time of each module app.py used to import eagerly, each in a fresh
+   interpreter. The deferred ones are now only paid once a page needs them.
+2. Time to login page: a fresh process runs app.py once with Streamlit's
+   AppTest (the first script run a visitor waits on), then reports when the
+   background detector warm-up became ready.
+
+Run from the repository root (uses a throwaway copy of candidates.db):
+    python -m benchmarks.bench_cold_start --runs 3
+"""
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# (module, still imported on the login page?)
+MODULES = [
+    ("streamlit", True),
+    ("database", True),
+    ("llm_client", True),
+    ("google.generativeai", False),
+    ("pandas", False),
+    ("streamlit_webrtc", False),
+    ("components.proctoring", False),
+    ("components.detectors", False),  # torch + transformers load with the DETR backends, on the warm-up thread
+]
+
+IMPORT_SCRIPT = """
+import time
+started = time.perf_counter()
+import {module}
+print(time.perf_counter() - started)
+"""
+
+LOGIN_SCRIPT = """
+import json, time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("app.py", default_timeout=300)
+at.run()
+login_seconds = time.perf_counter() - started
+assert not at.exception, at.exception
+assert len(at.text_input) == 2, "login form not rendered"
+from components.model_warmup import get_detector_warmup
+warmup = get_detector_warmup()
+warmup.wait(timeout=600)
+print(json.dumps({
+    "login_page": login_seconds,
+    "detector_ready": time.perf_counter() - started,
+    "detector_load": warmup.load_seconds,
+    "warmup_pass": warmup.warmup_seconds,
+}))
+"""
+
+
+def run_python(script, env):
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, env=env, check=True)
+    return result.stdout.strip().splitlines()[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "candidates.db")
+        source, target = sqlite3.connect("candidates.db"), sqlite3.connect(db_path)
+        source.backup(target)
+        source.close()
+        target.close()
+        env = {**os.environ, "CANDIDATES_DB": db_path, "METRICS_PORT": "0", "MOCK_API_CALLS": "1"}
+
+        print(f"{'module':<26}{'import s':>10}  login page")
+        for module, on_login_page in MODULES:
+            times = [float(run_python(IMPORT_SCRIPT.format(module=module), env)) for _ in range(args.runs)]
+            print(f"{module:<26}{statistics.median(times):>10.2f}  {'yes' if on_login_page else 'deferred'}")
+
+        runs = [json.loads(run_python(LOGIN_SCRIPT, env)) for _ in range(args.runs)]
+        print()
+        for key in ("login_page", "detector_ready", "detector_load", "warmup_pass"):
+            print(f"{key:<26}{statistics.median(run[key] for run in runs):>10.2f} s")
+
+
+if __name__ == "__main__":
+    main()
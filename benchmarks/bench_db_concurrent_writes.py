@@ -0,0 +1,92 @@
+# benchmarks/bench_db_concurrent_writes.py
+"""Many threads saving interview results at once: the old connect-per-call,
+rollback-journal code path against the pooled WAL-mode database module.
+
+Run from the repository root (uses a throwaway database in a temp directory):
+    python -m benchmarks.bench_db_concurrent_writes --threads 32 --writes 50
+"""
+import argparse
+import contextlib
+import datetime
+import importlib
+import io
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+EVALUATIONS = [{"id": i, "topic": "Topic", "question": "Question?", "level": "easy", "score": 3, "feedback": "Feedback."} for i in range(10)]
+
+
+def legacy_save(db_path, userid, evaluations, warning_count):
+    """save_interview_results as it was before the connection pool (default 5s timeout, rollback journal)."""
+    total_score = sum(item.get('score', 0) for item in evaluations)
+    max_score = len(evaluations) * 5
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        INSERT INTO interview_results (userid, interview_timestamp, total_score, max_score, final_percentage, warning_count, detailed_results)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', (userid, datetime.datetime.now().isoformat(), total_score, max_score, total_score / max_score * 100, warning_count, json.dumps(evaluations)))
+    conn.commit()
+    conn.close()
+
+
+def run(label, save, threads, writes):
+    errors = []
+
+    def worker(n):
+        for i in range(writes):
+            try:
+                save(f"user_{n}", EVALUATIONS, 0)
+            except sqlite3.OperationalError as e:
+                errors.append(str(e))
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    started = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - started
+    total = threads * writes
+    report = f"{label:<28} {total} writes in {elapsed:6.2f}s  ({total / elapsed:8.0f} writes/s, {len(errors)} failed writes)"
+    if errors:
+        report += f"\n{'':<28} first error: {errors[0]}"
+    print(report)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--writes", type=int, default=50, help="Writes per thread.")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    try:
+        os.environ["CANDIDATES_DB"] = os.path.join(workdir, "pooled.db")
+        import database
+        database = importlib.reload(database)
+        with contextlib.redirect_stdout(io.StringIO()):
+            database.init_db()
+
+        legacy_path = os.path.join(workdir, "legacy.db")
+        with sqlite3.connect(os.environ["CANDIDATES_DB"]) as source, sqlite3.connect(legacy_path) as target:
+            source.backup(target)
+            target.execute("PRAGMA journal_mode=DELETE")
+
+        run("Legacy (connect per call)", lambda *a: legacy_save(legacy_path, *a), args.threads, args.writes)
+        # Silence the per-save print in database.py while the threads run
+        with contextlib.redirect_stdout(io.StringIO()):
+            pooled = run("Pooled WAL", database.save_interview_results, args.threads, args.writes)
+        print(pooled)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# benchmarks/bench_frame_path.py
+"""Compares the per-frame cost of the old PIL round-trip in ProctoringProcessor.recv
+with the passthrough + downscaled ndarray sampling path.
+
+Run from the repository root:  python -m benchmarks.bench_frame_path
+"""
+import argparse
+import time
+
+import av
+import numpy as np
+
+
+def make_frame(width, height):
+    # Webcam frames arrive as yuv420p, not RGB
+    pixels = np.random.randint(0, 256, (height, width, 3), dtype=np.uint8)
+    return av.VideoFrame.from_ndarray(pixels, format="rgb24").reformat(format="yuv420p")
+
+
+def old_path(frame, frame_count):
+    img = frame.to_image()
+    if frame_count % 10 == 0:
+        img.copy()  # stands in for handing the PIL image to the detector
+    return av.VideoFrame.from_image(img)
+
+
+def new_path(frame, frame_count, sample_width=640):
+    if frame_count % 10 == 0:
+        height = round(frame.height * sample_width / frame.width / 2) * 2
+        frame.to_ndarray(width=sample_width, height=height, format="rgb24")
+    return frame
+
+
+def time_path(path, frame, iterations):
+    started = time.perf_counter()
+    for i in range(1, iterations + 1):
+        path(frame, i)
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    frame = make_frame(args.width, args.height)
+    old_us = time_path(old_path, frame, args.iterations)
+    new_us = time_path(new_path, frame, args.iterations)
+    print(f"Frame size: {args.width}x{args.height}, {args.iterations} frames, every 10th sampled")
+    print(f"PIL round-trip:       {old_us:9.1f} us/frame")
+    print(f"Passthrough + ndarray:{new_us:9.1f} us/frame")
+    print(f"Speedup:              {old_us / new_us:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# benchmarks/bench_intro_roundtrip.py
+"""Measures the latency of the introduction step: the old two-call flow
+(NAME_EXTRACTION_PROMPT_TEMPLATE, then TRANSITION_TO_QUESTIONS_PROMPT_TEMPLATE)
+against the single INTRODUCTION_PROMPT_TEMPLATE JSON call.
+
+Needs GOOGLE_API_KEY in the environment. Run from the repository root:
+    python -m benchmarks.bench_intro_roundtrip --trials 10
+"""
+import argparse
+import os
+import statistics
+import time
+
+import google.generativeai as genai
+
+from prompts import (
+    INTERVIEWER_PERSONA, INTRODUCTION_PROMPT_TEMPLATE,
+    NAME_EXTRACTION_PROMPT_TEMPLATE, TRANSITION_TO_QUESTIONS_PROMPT_TEMPLATE,
+)
+from response_parsing import parse_introduction_response
+
+INTRODUCTIONS = [
+    "Hi, my name is Priya. I have been working as a financial analyst for three years.",
+    "Hello, I'm Amit and I use Excel every day for reporting.",
+    "Good morning. I work in operations and mostly build pivot tables.",
+]
+
+
+def two_calls(model, introduction):
+    name = model.generate_content(NAME_EXTRACTION_PROMPT_TEMPLATE.format(introduction=introduction)).text.strip()
+    model.generate_content(TRANSITION_TO_QUESTIONS_PROMPT_TEMPLATE.format(name=name)).text
+
+
+def one_call(model, introduction):
+    response = model.generate_content(
+        INTRODUCTION_PROMPT_TEMPLATE.format(introduction=introduction),
+        generation_config={"response_mime_type": "application/json"},
+    )
+    parse_introduction_response(response.text)
+
+
+def measure(flow, model, trials):
+    timings = []
+    for i in range(trials):
+        started = time.perf_counter()
+        flow(model, INTRODUCTIONS[i % len(INTRODUCTIONS)])
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def report(label, timings):
+    print(f"{label:<22} mean {statistics.mean(timings):7.0f} ms   "
+          f"p50 {statistics.median(timings):7.0f} ms   max {max(timings):7.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--trials", type=int, default=10)
+    args = parser.parse_args()
+
+    genai.configure(api_key=os.environ["GOOGLE_API_KEY"])
+    model = genai.GenerativeModel(model_name="gemini-1.5-flash", system_instruction=INTERVIEWER_PERSONA)
+
+    report("Before (2 calls)", measure(two_calls, model, args.trials))
+    report("After (1 JSON call)", measure(one_call, model, args.trials))
+
+
+if __name__ == "__main__":
+    main()
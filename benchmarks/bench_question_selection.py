@@ -0,0 +1,77 @@
+# benchmarks/bench_question_selection.py
+"""Interview question selection on a large synthetic bank: the old
+re-read-and-filter select_questions() against the preloaded QuestionBank.
+
+Run from the repository root (writes the synthetic bank to a temp directory):
+    python -m benchmarks.bench_question_selection --questions 50000 --interviews 200
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from question_bank import QuestionBank, get_question_bank
+
+LEVELS = ["easy", "mid", "hard"]
+
+
+def make_bank(n, topics):
+    return [
+        {"id": i, "level": random.choice(LEVELS), "topic": f"Topic {i % topics}", "question": f"Question {i}?"}
+        for i in range(1, n + 1)
+    ]
+
+
+def legacy_select(path):
+    """select_questions() as it was before the question bank."""
+    all_questions = json.load(open(path))
+    easy_q, mid_q, hard_q = [q for q in all_questions if q['level'] == 'easy'], [q for q in all_questions if q['level'] == 'mid'], [q for q in all_questions if q['level'] == 'hard']
+    selected_questions = random.sample(hard_q, 2) + random.sample(easy_q + mid_q, 8)
+    random.shuffle(selected_questions)
+    return selected_questions
+
+
+def timed(label, fn, runs):
+    started = time.perf_counter()
+    for _ in range(runs):
+        result = fn()
+    elapsed_ms = (time.perf_counter() - started) * 1000 / runs
+    print(f"{label:<40} {elapsed_ms:9.3f} ms/interview")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=50000)
+    parser.add_argument("--topics", type=int, default=40)
+    parser.add_argument("--interviews", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "questions.json")
+        with open(path, "w") as f:
+            json.dump(make_bank(args.questions, args.topics), f)
+        print(f"{args.questions} questions, {args.topics} topics, {args.interviews} interviews\n")
+
+        timed("legacy (json.load + filter per start)", lambda: legacy_select(path), max(args.interviews // 20, 1))
+
+        started = time.perf_counter()
+        get_question_bank(path)
+        print(f"{'question bank first load':<40} {(time.perf_counter() - started) * 1000:9.3f} ms (once per process)")
+
+        seen = set(random.sample(range(1, args.questions + 1), 1000))
+        selected = timed("question bank select()", lambda: get_question_bank(path).select(exclude_ids=seen), args.interviews)
+
+        topics = {q['topic'] for q in selected}
+        levels = [q['level'] for q in selected]
+        print(f"\nlast interview: {levels.count('hard')} hard, {len(selected) - levels.count('hard')} easy/mid, "
+              f"{len(topics)} distinct topics, {len(seen & {q['id'] for q in selected})} repeats")
+
+        small = QuestionBank.load("questions.json")
+        timed("select() on the shipped questions.json", small.select, args.interviews)
+
+
+if __name__ == "__main__":
+    main()
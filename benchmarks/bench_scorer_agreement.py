@@ -0,0 +1,77 @@
+# benchmarks/bench_scorer_agreement.py
+"""Reports how often the local scorer grades an answer without the LLM, and how
+well its grades agree with the LLM grader's scores in scoring_fixtures.json.
+
+Agreement is measured only against labels the LLM produced (label_source "llm");
+hand-assigned labels are reported separately as a sanity check. Run --relabel
+to grade every fixture with the live LLM grader.
+
+Run from the repository root:
+    python -m benchmarks.bench_scorer_agreement
+    python -m benchmarks.bench_scorer_agreement --relabel   # re-grade the fixtures with Gemini first (needs GOOGLE_API_KEY)
+"""
+import argparse
+import json
+import os
+
+from scoring import ReferenceIndex, score_locally
+
+FIXTURES_PATH = os.path.join(os.path.dirname(__file__), "scoring_fixtures.json")
+
+
+def relabel_with_llm(fixtures, questions):
+    import google.generativeai as genai
+    from grading import grade_answer
+    from llm_client import LLMClient
+    from prompts import INTERVIEWER_PERSONA
+
+    genai.configure(api_key=os.environ["GOOGLE_API_KEY"])
+    client = LLMClient(model=genai.GenerativeModel(model_name="gemini-1.5-flash", system_instruction=INTERVIEWER_PERSONA))
+    for item in fixtures["answers"]:
+        # The same LLM path the live app escalates to, with the local scorer skipped
+        item["score"] = grade_answer(client, questions[item["question_id"]], item["answer"], hedge=False)["score"]
+        item["label_source"] = "llm"
+    with open(FIXTURES_PATH, "w") as f:
+        json.dump(fixtures, f, indent=4)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--relabel", action="store_true", help="Replace the fixture labels with live LLM grades first.")
+    args = parser.parse_args()
+
+    with open("questions.json") as f:
+        questions = {q["id"]: q for q in json.load(f)}
+    with open(FIXTURES_PATH) as f:
+        fixtures = json.load(f)
+    if args.relabel:
+        relabel_with_llm(fixtures, questions)
+
+    index = ReferenceIndex(questions.values())
+    local = 0
+    agreement = {}  # label_source -> [graded locally, exact, within one]
+    for item in fixtures["answers"]:
+        result = score_locally(questions[item["question_id"]], item["answer"], index)
+        if result is None:
+            continue
+        local += 1
+        counts = agreement.setdefault(item["label_source"], [0, 0, 0])
+        counts[0] += 1
+        counts[1] += result["score"] == item["score"]
+        counts[2] += abs(result["score"] - item["score"]) <= 1
+
+    total = len(fixtures["answers"])
+    sources = sorted({item["label_source"] for item in fixtures["answers"]})
+    print(f"Fixtures: {total} answers (labels: {', '.join(sources)})")
+    print(f"Graded locally: {local}/{total} ({local / total:.0%}), escalated to LLM: {total - local}")
+    if "llm" in agreement:
+        graded, exact, within_one = agreement["llm"]
+        print(f"Agreement with the LLM grader on {graded} local grades: exact {exact / graded:.0%}, within one point {within_one / graded:.0%}")
+    else:
+        print("No LLM labels yet; run with --relabel to measure agreement with the LLM grader.")
+    for source, (graded, exact, within_one) in sorted(agreement.items()):
+        if source != "llm":
+            print(f"  ({source} labels, {graded} local grades: exact {exact / graded:.0%}, within one point {within_one / graded:.0%})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+# benchmarks/load_test.py
+"""Headless load test: N synthetic candidates interviewing at once on this node.
+
+Each session drives the real app.py through Streamlit's AppTest (login, start,
+introduction, every answer and psych follow-up, submit) against a fake LLM with
+configurable latency and error rate, while a synthetic webcam feeds frames into
+its own ProctoringProcessor. Reports p50/p95/p99 turn latency per stage,
+throughput, CPU and RSS.
+
+Run from the repository root (uses a throwaway copy of candidates.db):
+    python -m benchmarks.load_test --sessions 200 --concurrency 50 --llm-latency-ms 800 --llm-sigma 0.5 --llm-error-rate 0.02
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+ANSWERS = [
+    "I would use VLOOKUP with an exact match, or INDEX and MATCH if the lookup column is on the right.",
+    "A relative reference changes when copied, while an absolute reference with dollar signs stays fixed.",
+    "I'm not sure, I think you can do that with a pivot table.",
+    "Use conditional formatting with a formula rule so the whole row is highlighted.",
+    "SUMIFS adds up values that meet several criteria at once.",
+]
+PSYCH_REPLIES = ["Yes", "I'm sure", "I think so, yes.", "No, that's all."]
+INTRODUCTION = "Hi, my name is Load Tester and I have used Excel for five years in finance."
+MAX_TURNS = 40
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def current_rss_mb():
+    """Resident set size of this process (Linux), falling back to the peak."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class ResourceSampler:
+    """Samples RSS once a second in the background and keeps the peak."""
+
+    def __init__(self):
+        self.peak_rss_mb = current_rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(1.0):
+            self.peak_rss_mb = max(self.peak_rss_mb, current_rss_mb())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+class SyntheticWebcam:
+    """Feeds a looping clip of synthetic frames into one ProctoringProcessor at a fixed frame rate.
+
+    The clip is a gray background with a bright block moving across it, so the
+    adaptive sampler sees motion and sends frames on to the detection server.
+    """
+
+    def __init__(self, processor, frames, fps):
+        self.processor = processor
+        self.frames = frames
+        self.fps = fps
+        self.recv_ms = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @staticmethod
+    def make_clip(width=640, height=480, length=30):
+        import av
+        import numpy as np
+        frames = []
+        for i in range(length):
+            image = np.full((height, width, 3), 96, dtype=np.uint8)
+            x = i * (width - 80) // length
+            image[height // 3:height // 3 + 120, x:x + 80] = 230
+            frames.append(av.VideoFrame.from_ndarray(image, format="rgb24"))
+        return frames
+
+    def _run(self):
+        i = 0
+        while not self._stop.is_set():
+            started = time.perf_counter()
+            self.processor.recv(self.frames[i % len(self.frames)])
+            elapsed = time.perf_counter() - started
+            self.recv_ms.append(elapsed * 1000)
+            i += 1
+            self._stop.wait(max(1 / self.fps - elapsed, 0))
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.processor.on_ended()
+
+
+def prepare_database(tmp, sessions):
+    """A copy of candidates.db with one synthetic candidate per session, so no session resumes another's log."""
+    db_path = os.path.join(tmp, "candidates.db")
+    source = sqlite3.connect("candidates.db")
+    target = sqlite3.connect(db_path)
+    source.backup(target)
+    source.close()
+    target.executemany(
+        "INSERT OR IGNORE INTO candidates VALUES (?, ?, ?, ?)",
+        [(f"load_{n}", "load", f"Load Tester {n}", f"load_{n}@example.com") for n in range(sessions)]
+    )
+    target.commit()
+    target.close()
+    return db_path
+
+
+def run_session(n, args, clip):
+    """Runs one synthetic interview. Returns (turn latencies by stage, webcam recv times, error or None)."""
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(n)
+    turns = defaultdict(list)
+    webcam = None
+    if args.fps > 0:
+        # Only proctored runs need torch and the model weights
+        from components.proctoring import ProctoringProcessor
+        webcam = SyntheticWebcam(ProctoringProcessor(), clip, args.fps)
+
+    def turn(stage, action):
+        started = time.perf_counter()
+        action().run()
+        turns[stage].append((time.perf_counter() - started) * 1000)
+        if at.exception:
+            raise RuntimeError(f"{stage}: {at.exception[0].value}")
+        time.sleep(rng.uniform(0, args.think_time))
+
+    at = AppTest.from_file("app.py", default_timeout=args.timeout)
+    try:
+        at.run()
+        at.text_input[0].input(f"load_{n}")
+        at.text_input[1].input("load")
+        turn("login", lambda: at.button("login_button").click())
+        if webcam:
+            webcam.start()
+        turn("start", lambda: at.button("start_button").click())
+        for _ in range(MAX_TURNS):
+            stage = at.session_state["stage"]
+            if stage == "INTERVIEW_COMPLETE":
+                break
+            if stage == "BOT_INTRODUCTION":
+                reply = INTRODUCTION
+            elif stage == "AWAITING_PSYCH_RESPONSE":
+                reply = rng.choice(PSYCH_REPLIES)
+            else:
+                reply = rng.choice(ANSWERS)
+            turn(stage, lambda: at.chat_input[0].set_value(reply))
+        else:
+            raise RuntimeError(f"Interview did not finish in {MAX_TURNS} turns")
+        turn("submit", lambda: at.button("submit_button").click())
+        if at.session_state["page"] != "EVALUATION":
+            raise RuntimeError(f"Ended on page {at.session_state['page']}")
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        if webcam:
+            webcam.stop()
+    return turns, webcam.recv_ms if webcam else [], error
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=20, help="sessions running at the same time")
+    parser.add_argument("--think-time", type=float, default=2.0, help="max seconds a candidate waits between turns")
+    parser.add_argument("--fps", type=float, default=15, help="synthetic webcam frame rate (0 disables proctoring)")
+    parser.add_argument("--llm-latency-ms", type=float, default=800)
+    parser.add_argument("--llm-sigma", type=float, default=0.5, help="log-normal spread of fake LLM latency")
+    parser.add_argument("--llm-error-rate", type=float, default=0.02)
+    parser.add_argument("--rpm", type=int, default=6000, help="LLM requests per minute allowed by the client")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds one script run may take")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # app.py reads these when AppTest first runs it in this process
+        os.environ.update({
+            "MOCK_API_CALLS": "1",
+            "SIMULATED_CAMERA": "1",
+            "CANDIDATES_DB": prepare_database(tmp, args.sessions),
+            "FAKE_LLM_LATENCY_MS": str(args.llm_latency_ms),
+            "FAKE_LLM_SIGMA": str(args.llm_sigma),
+            "FAKE_LLM_ERROR_RATE": str(args.llm_error_rate),
+            "LLM_REQUESTS_PER_MINUTE": str(args.rpm),
+        })
+        clip = SyntheticWebcam.make_clip() if args.fps > 0 else []
+        print(f"{args.sessions} sessions, {args.concurrency} concurrent, fake LLM {args.llm_latency_ms:.0f} ms "
+              f"(sigma {args.llm_sigma}, {args.llm_error_rate:.0%} errors), webcam {args.fps} fps\n")
+
+        usage_before = resource.getrusage(resource.RUSAGE_SELF)
+        started = time.perf_counter()
+        with ResourceSampler() as sampler, ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            results = list(executor.map(lambda n: run_session(n, args, clip), range(args.sessions)))
+        wall = time.perf_counter() - started
+        usage_after = resource.getrusage(resource.RUSAGE_SELF)
+
+    latencies, recv_ms, errors = defaultdict(list), [], []
+    for turns, session_recv_ms, error in results:
+        for stage, values in turns.items():
+            latencies[stage] += values
+        recv_ms += session_recv_ms
+        if error:
+            errors.append(error)
+    all_turns = [value for values in latencies.values() for value in values]
+    cpu_seconds = (usage_after.ru_utime - usage_before.ru_utime) + (usage_after.ru_stime - usage_before.ru_stime)
+
+    report = {
+        "sessions": args.sessions,
+        "completed": args.sessions - len(errors),
+        "wall_seconds": round(wall, 1),
+        "sessions_per_minute": round((args.sessions - len(errors)) / wall * 60, 1),
+        "turns_per_second": round(len(all_turns) / wall, 2),
+        "cpu_percent": round(cpu_seconds / wall * 100, 1),
+        "peak_rss_mb": round(sampler.peak_rss_mb, 1),
+        "turn_latency_ms": {
+            stage: {"count": len(values), **{f"p{p}": round(percentile(values, p), 1) for p in (50, 95, 99)}}
+            for stage, values in sorted(latencies.items()) + [("all", all_turns)]
+        },
+        "webcam_recv_ms": {f"p{p}": round(percentile(recv_ms, p), 2) for p in (50, 95, 99)},
+        "errors": errors[:10],
+    }
+
+    print(f"{'stage':<26}{'turns':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for stage, stats in report["turn_latency_ms"].items():
+        print(f"{stage:<26}{stats['count']:>7}{stats['p50']:>10.1f}{stats['p95']:>10.1f}{stats['p99']:>10.1f}")
+    print(f"\ncompleted {report['completed']}/{args.sessions} sessions in {report['wall_seconds']}s "
+          f"({report['sessions_per_minute']} sessions/min, {report['turns_per_second']} turns/s)")
+    print(f"CPU {report['cpu_percent']}% of one core, peak RSS {report['peak_rss_mb']} MB, "
+          f"webcam recv p50/p99 {report['webcam_recv_ms']['p50']}/{report['webcam_recv_ms']['p99']} ms")
+    for error in report["errors"]:
+        print(f"error: {error}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# components/detection_server.py
+import threading
+import time
+from collections import OrderedDict, deque
+
+from metrics import counter, histogram
+
+
+class DetectionServer:
+    """Runs the detector for every proctoring session in the process as micro-batches.
+
+    Each session holds at most one pending frame; submitting again replaces it.
+    Sessions are served in the order they first queued a frame, so a camera that
+    submits often cannot push the others out of a batch. Detectors with a
+    concurrency above 1 (the remote backend) get one serving thread each, so
+    several batches can be in flight at once.
+    """
+
+    def __init__(self, detector, max_batch_size=8, max_wait_ms=30, max_frame_age=2.0,
+                 cpu_budget=0.5, load_window=10.0):
+        self.detector = detector
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_frame_age = max_frame_age
+        # Fraction of wall time the detector may be busy before sessions are slowed down
+        self.cpu_budget = cpu_budget
+        self.load_window = load_window
+        self._recent_batches = deque()  # (finished_at, elapsed_seconds)
+
+        self._condition = threading.Condition()
+        self._pending = OrderedDict()  # session_id -> (submitted_at, frame, callback)
+
+        self.batch_count = 0
+        self.frames_processed = 0
+        self.frames_dropped = 0
+        self.total_batch_ms = 0.0
+
+        self._workers = [
+            threading.Thread(target=self._serve_loop, daemon=True)
+            for _ in range(getattr(detector, "concurrency", 1))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, session_id, frame, callback):
+        """Queues frame for session_id. Returns True if it replaced an unprocessed frame."""
+        with self._condition:
+            replaced = session_id in self._pending
+            if replaced:
+                self.frames_dropped += 1
+                counter("detector_frames_total", "Frames handled by the detection server").inc(result="replaced")
+            self._pending[session_id] = (time.monotonic(), frame, callback)
+            self._condition.notify()
+        return replaced
+
+    def unregister(self, session_id):
+        """Discards any pending frame for a session that has ended."""
+        with self._condition:
+            self._pending.pop(session_id, None)
+
+    def load_factor(self):
+        """Returns how far over its CPU budget the detector has been recently (1.0 = within budget)."""
+        with self._condition:
+            self._trim_recent_batches(time.monotonic())
+            busy = sum(elapsed for _, elapsed in self._recent_batches) / (self.load_window * len(self._workers))
+        return max(1.0, busy / self.cpu_budget)
+
+    def get_stats(self):
+        with self._condition:
+            return {
+                "pending_sessions": len(self._pending),
+                "batch_count": self.batch_count,
+                "frames_processed": self.frames_processed,
+                "frames_dropped": self.frames_dropped,
+                "avg_batch_size": self.frames_processed / self.batch_count if self.batch_count else 0.0,
+                "avg_batch_ms": self.total_batch_ms / self.batch_count if self.batch_count else 0.0,
+            }
+
+    def _trim_recent_batches(self, now):
+        while self._recent_batches and now - self._recent_batches[0][0] > self.load_window:
+            self._recent_batches.popleft()
+
+    def _next_batch(self):
+        with self._condition:
+            while not self._pending:
+                self._condition.wait()
+
+            # Give other sessions a short window to fill the batch
+            deadline = time.monotonic() + self.max_wait
+            while len(self._pending) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            now = time.monotonic()
+            batch = []
+            while self._pending and len(batch) < self.max_batch_size:
+                session_id, (submitted_at, frame, callback) = self._pending.popitem(last=False)
+                if now - submitted_at > self.max_frame_age:
+                    self.frames_dropped += 1
+                    counter("detector_frames_total").inc(result="stale")
+                    continue
+                batch.append((session_id, frame, callback))
+            return batch
+
+    def _serve_loop(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                continue
+
+            started = time.perf_counter()
+            try:
+                detections = self.detector.detect([frame for _, frame, _ in batch])
+            except Exception as e:
+                print(f"Detection batch of {len(batch)} failed: {e}")
+                continue
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            backend = type(self.detector).__name__
+            histogram("detector_batch_seconds", "Detector forward passes per micro-batch").observe(elapsed_ms / 1000, backend=backend)
+            histogram("detector_batch_size", "Frames per micro-batch", buckets=range(1, self.max_batch_size + 1)).observe(len(batch), backend=backend)
+            counter("detector_frames_total").inc(len(batch), result="processed")
+
+            with self._condition:
+                self.batch_count += 1
+                self.frames_processed += len(batch)
+                self.total_batch_ms += elapsed_ms
+                self._recent_batches.append((time.monotonic(), elapsed_ms / 1000))
+
+            for (session_id, _, callback), detection in zip(batch, detections):
+                callback(detection, elapsed_ms)
@@ -0,0 +1,231 @@
+# components/detectors.py
+import json
+import os
+
+import numpy as np
+
+# torch and transformers are imported inside the DETR backends, so the ONNX
+# and remote backends run without them
+
+MODEL_NAME = "facebook/detr-resnet-50"
+
+# Keep detections with score > 0.9
+SCORE_THRESHOLD = 0.9
+
+# Which backend proctoring uses: "detr", "detr-int8", "onnx" or "remote"
+DETECTOR_BACKEND = os.environ.get("DETECTOR_BACKEND", "detr")
+
+# The backend that forwards frames to components/inference_service.py
+REMOTE_BACKEND = "remote"
+
+ONNX_MODEL_PATH = os.environ.get("DETECTOR_ONNX_PATH", "models/detr-resnet-50.onnx")
+
+# (height, width) fed to the ONNX graph; well below DETR's default 800px
+ONNX_INPUT_SIZE = (384, 512)
+
+IMAGENET_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32).reshape(3, 1, 1)
+IMAGENET_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32).reshape(3, 1, 1)
+
+
+def frames_to_arrays(frames):
+    """Stacks HxWx3 uint8 RGB arrays into normalized float32 NCHW DETR inputs without going through PIL.
+
+    Frames of different sizes are zero-padded to the largest one; the returned
+    int64 pixel_mask marks the real pixels.
+    """
+    height = max(f.shape[0] for f in frames)
+    width = max(f.shape[1] for f in frames)
+    pixel_values = np.zeros((len(frames), 3, height, width), dtype=np.float32)
+    pixel_mask = np.zeros((len(frames), height, width), dtype=np.int64)
+    for i, frame in enumerate(frames):
+        h, w = frame.shape[:2]
+        pixels = frame.transpose(2, 0, 1).astype(np.float32) / 255.0
+        pixel_values[i, :, :h, :w] = (pixels - IMAGENET_MEAN) / IMAGENET_STD
+        pixel_mask[i, :h, :w] = 1
+    return pixel_values, pixel_mask
+
+
+def _bilinear_weights(in_size, out_size):
+    # Same sampling grid as torch's interpolate(mode="bilinear", align_corners=False)
+    source = np.maximum((np.arange(out_size, dtype=np.float32) + 0.5) * (in_size / out_size) - 0.5, 0)
+    lower = np.minimum(source.astype(np.int64), in_size - 1)
+    upper = np.minimum(lower + 1, in_size - 1)
+    return lower, upper, (source - lower).astype(np.float32)
+
+
+def resize_bilinear(images, size):
+    """Resizes an NCHW float array to size=(height, width) with bilinear interpolation."""
+    top, bottom, wy = _bilinear_weights(images.shape[2], size[0])
+    left, right, wx = _bilinear_weights(images.shape[3], size[1])
+    wy = wy[:, None]
+    rows = images[:, :, top, :] * (1 - wy) + images[:, :, bottom, :] * wy
+    return rows[..., left] * (1 - wx) + rows[..., right] * wx
+
+
+def summarize_labels(label_ids, id2label):
+    """Reduces the labels detected in one frame to the counts proctoring cares about."""
+    person_count = 0
+    phone_detected = False
+    for label_id in label_ids:
+        label_name = id2label[int(label_id)]
+        if label_name == 'person':
+            person_count += 1
+        if label_name == 'cell phone':
+            phone_detected = True
+    return {"person_count": person_count, "phone_detected": phone_detected}
+
+
+class DetectorBackend:
+    """Common interface for proctoring detectors.
+
+    detect() takes a list of HxWx3 uint8 RGB arrays and returns one
+    {"person_count": int, "phone_detected": bool} dict per frame.
+    sample_width is the width frames should be downscaled to before detect().
+    concurrency is how many detect() calls may usefully run at once.
+    """
+
+    name = "base"
+    sample_width = 640
+    concurrency = 1
+
+    def detect(self, images):
+        raise NotImplementedError
+
+
+class DetrDetector(DetectorBackend):
+    """The full-precision Hugging Face DETR model."""
+
+    name = "detr"
+
+    def __init__(self):
+        from transformers import DetrImageProcessor, DetrForObjectDetection
+
+        self.processor = DetrImageProcessor.from_pretrained(MODEL_NAME)
+        self.model = DetrForObjectDetection.from_pretrained(MODEL_NAME)
+        self.model.eval()
+
+    def detect(self, frames):
+        import torch
+
+        pixel_values, pixel_mask = frames_to_arrays(frames)
+        with torch.no_grad():
+            outputs = self.model(pixel_values=torch.from_numpy(pixel_values), pixel_mask=torch.from_numpy(pixel_mask))
+
+        target_sizes = torch.tensor([frame.shape[:2] for frame in frames])
+        results = self.processor.post_process_object_detection(outputs, target_sizes=target_sizes, threshold=SCORE_THRESHOLD)
+        return [summarize_labels(r["labels"], self.model.config.id2label) for r in results]
+
+
+class QuantizedDetrDetector(DetrDetector):
+    """DETR with its Linear layers dynamically quantized to int8."""
+
+    name = "detr-int8"
+
+    def __init__(self):
+        import torch
+
+        super().__init__()
+        self.model = torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def onnx_labels_path(path):
+    """The id2label JSON written next to an exported ONNX graph."""
+    return os.path.splitext(path)[0] + ".labels.json"
+
+
+def save_onnx_labels(path, id2label):
+    with open(onnx_labels_path(path), "w") as f:
+        json.dump({str(k): v for k, v in id2label.items()}, f)
+
+
+def load_onnx_labels(path):
+    """Returns the id2label map for an exported graph; older exports get the file written once via transformers."""
+    labels_path = onnx_labels_path(path)
+    if not os.path.exists(labels_path):
+        from transformers import DetrConfig
+        save_onnx_labels(path, DetrConfig.from_pretrained(MODEL_NAME).id2label)
+    with open(labels_path) as f:
+        return {int(k): v for k, v in json.load(f).items()}
+
+
+def export_detr_onnx(path=ONNX_MODEL_PATH, input_size=ONNX_INPUT_SIZE):
+    """Exports DETR to an ONNX graph with a dynamic batch dimension, plus its id2label map."""
+    import torch
+    from transformers import DetrForObjectDetection
+
+    class DetrLogitsAndBoxes(torch.nn.Module):
+        """Wraps DETR so the exported graph has exactly two outputs."""
+
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, pixel_values):
+            outputs = self.model(pixel_values=pixel_values)
+            return outputs.logits, outputs.pred_boxes
+
+    model = DetrForObjectDetection.from_pretrained(MODEL_NAME)
+    model.eval()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    dummy = torch.zeros(1, 3, *input_size)
+    torch.onnx.export(
+        DetrLogitsAndBoxes(model), (dummy,), path,
+        input_names=["pixel_values"],
+        output_names=["logits", "pred_boxes"],
+        dynamic_axes={"pixel_values": {0: "batch"}, "logits": {0: "batch"}, "pred_boxes": {0: "batch"}},
+        opset_version=17,
+    )
+    save_onnx_labels(path, model.config.id2label)
+    return path
+
+
+class OnnxDetrDetector(DetectorBackend):
+    """DETR exported to ONNX and run with ONNX Runtime at a reduced resolution.
+
+    Pre- and post-processing are plain NumPy, so torch and transformers are
+    only loaded if the graph has to be exported first.
+    """
+
+    name = "onnx"
+    sample_width = ONNX_INPUT_SIZE[1]
+
+    def __init__(self, path=ONNX_MODEL_PATH, input_size=ONNX_INPUT_SIZE):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("DETECTOR_BACKEND=onnx requires the 'onnxruntime' package.") from e
+
+        if not os.path.exists(path):
+            export_detr_onnx(path, input_size)
+        self.input_size = input_size
+        self.session = ort.InferenceSession(path, providers=["CPUExecutionProvider"])
+        self.id2label = load_onnx_labels(path)
+
+    def detect(self, frames):
+        pixel_values, _ = frames_to_arrays(frames)
+        # The exported graph has a fixed input size
+        pixel_values = resize_bilinear(pixel_values, self.input_size)
+        logits, _ = self.session.run(None, {"pixel_values": np.ascontiguousarray(pixel_values, dtype=np.float32)})
+
+        # Softmax over classes, ignoring DETR's trailing "no object" class
+        exp = np.exp(logits - logits.max(axis=-1, keepdims=True))
+        probs = (exp / exp.sum(axis=-1, keepdims=True))[..., :-1]
+        scores, labels = probs.max(axis=-1), probs.argmax(axis=-1)
+        return [summarize_labels(l[s > SCORE_THRESHOLD], self.id2label) for s, l in zip(scores, labels)]
+
+
+DETECTOR_BACKENDS = {
+    DetrDetector.name: DetrDetector,
+    QuantizedDetrDetector.name: QuantizedDetrDetector,
+    OnnxDetrDetector.name: OnnxDetrDetector,
+}
+
+
+def create_detector(name=DETECTOR_BACKEND):
+    """Builds the detector backend registered under name, or the remote client for "remote"."""
+    if name == REMOTE_BACKEND:
+        from components.inference_client import RemoteDetector
+        return RemoteDetector()
+    if name not in DETECTOR_BACKENDS:
+        raise ValueError(f"Unknown detector backend '{name}'. Choose one of: {', '.join([*DETECTOR_BACKENDS, REMOTE_BACKEND])}")
+    return DETECTOR_BACKENDS[name]()
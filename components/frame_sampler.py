@@ -0,0 +1,70 @@
+# components/frame_sampler.py
+import time
+
+import numpy as np
+
+# Tiny grayscale thumbnail used to score scene changes between detections
+THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT = 32, 24
+
+
+def frame_thumbnail(frame):
+    """Returns a THUMBNAIL_WIDTH x THUMBNAIL_HEIGHT grayscale copy of an av.VideoFrame."""
+    return frame.to_ndarray(width=THUMBNAIL_WIDTH, height=THUMBNAIL_HEIGHT, format="gray").astype(np.int16)
+
+
+class AdaptiveSampler:
+    """Decides which frames of one camera are worth a full detection.
+
+    While the scene stays still, the interval between detections backs off
+    from min_interval towards max_interval. A scene change, or a detection
+    that produced a warning, snaps it back to min_interval. load_factor is an
+    optional callable returning a multiplier >= 1 that stretches the interval
+    when the detection server is over its CPU budget.
+    """
+
+    def __init__(self, min_interval=0.3, max_interval=3.0, backoff=1.5, motion_threshold=12.0, load_factor=None):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.motion_threshold = motion_threshold
+        self.load_factor = load_factor or (lambda: 1.0)
+
+        self.interval = min_interval
+        self.last_motion_score = 0.0
+        self._last_sample_at = None
+        self._reference = None
+
+    def should_sample(self, frame, now=None):
+        """Scores frame against the last sampled scene and returns True if it should be analyzed."""
+        now = time.monotonic() if now is None else now
+        thumbnail = frame_thumbnail(frame)
+
+        if self._reference is None:
+            self._take_sample(thumbnail, now)
+            return True
+
+        self.last_motion_score = float(np.abs(thumbnail - self._reference).mean())
+        elapsed = now - self._last_sample_at
+        if elapsed < self.min_interval:
+            return False
+
+        if self.last_motion_score >= self.motion_threshold:
+            self.interval = self.min_interval
+            self._take_sample(thumbnail, now)
+            return True
+
+        if elapsed >= self.interval * self.load_factor():
+            self._take_sample(thumbnail, now)
+            return True
+        return False
+
+    def on_result(self, is_warning):
+        """Adjusts the interval after a detection finishes."""
+        if is_warning:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+
+    def _take_sample(self, thumbnail, now):
+        self._reference = thumbnail
+        self._last_sample_at = now
@@ -0,0 +1,134 @@
+# components/inference_client.py
+"""Client side of the out-of-process inference service: the socket protocol and RemoteDetector.
+
+Only the standard library and NumPy are imported here, so DETECTOR_BACKEND=remote
+keeps torch and transformers out of the Streamlit process.
+"""
+import glob
+import json
+import os
+import queue
+import socket
+import stat
+import struct
+import time
+
+import numpy as np
+
+from components.detectors import REMOTE_BACKEND, DetectorBackend
+
+def _default_socket_dir():
+    # The per-user runtime directory if there is one, otherwise a per-user path under /tmp
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "excel-interviewer-inference")
+    return f"/tmp/excel-interviewer-inference-{os.getuid()}"
+
+# Where the inference service (components/inference_service.py) puts its worker sockets
+INFERENCE_SOCKET_DIR = os.environ.get("INFERENCE_SOCKET_DIR") or _default_socket_dir()
+
+
+def check_socket_dir(path):
+    """Raises PermissionError unless path is a real directory owned by this user and closed to everyone else.
+
+    Webcam frames go through these sockets, so a directory another local user
+    created or can write to must not be trusted by either side.
+    """
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode):
+        raise PermissionError(f"Inference socket path {path} is not a directory.")
+    if info.st_uid != os.getuid():
+        raise PermissionError(f"Inference socket directory {path} is owned by another user.")
+    if info.st_mode & 0o077:
+        raise PermissionError(f"Inference socket directory {path} is accessible to other users (run: chmod 700 {path}).")
+
+
+_LENGTH = struct.Struct("!I")
+
+
+def send_message(sock, header, buffers=()):
+    """Sends a JSON header followed by raw buffers (e.g. frame arrays) as one length-prefixed message."""
+    header_bytes = json.dumps(header).encode()
+    views = [memoryview(b).cast("B") for b in buffers]
+    sock.sendall(_LENGTH.pack(len(header_bytes)) + header_bytes + _LENGTH.pack(sum(len(v) for v in views)))
+    for view in views:
+        sock.sendall(view)
+
+
+def _recv_exactly(sock, size):
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if not count:
+            raise ConnectionError("Inference connection closed.")
+        received += count
+    return buffer
+
+
+def recv_message(sock):
+    """Receives one message sent by send_message(). Returns (header, payload bytearray)."""
+    header = json.loads(_recv_exactly(sock, _LENGTH.unpack(_recv_exactly(sock, _LENGTH.size))[0]))
+    return header, _recv_exactly(sock, _LENGTH.unpack(_recv_exactly(sock, _LENGTH.size))[0])
+
+
+class RemoteDetector(DetectorBackend):
+    """Sends frames to the out-of-process inference service over Unix sockets.
+
+    The model then lives only in the service's worker processes, off this
+    process's GIL. One connection is kept per worker, so up to `concurrency`
+    batches are detected in parallel. Frames travel as raw RGB bytes.
+    """
+
+    name = REMOTE_BACKEND
+
+    def __init__(self, socket_dir=INFERENCE_SOCKET_DIR, connect_timeout=60.0, request_timeout=120.0):
+        self.request_timeout = request_timeout
+        deadline = time.monotonic() + connect_timeout
+        # The service binds every worker's socket before loading any model
+        while True:
+            paths = []
+            if os.path.isdir(socket_dir):
+                check_socket_dir(socket_dir)
+                paths = sorted(glob.glob(os.path.join(socket_dir, "detector-*.sock")))
+            if paths:
+                break
+            if time.monotonic() > deadline:
+                raise ConnectionError(f"No inference service sockets in {socket_dir}. Start it with: python -m components.inference_service")
+            time.sleep(0.5)
+        self.concurrency = len(paths)
+        self._idle = queue.Queue()
+        for path in paths:
+            self._idle.put({"path": path, "sock": self._connect(path)})
+        info = self._request({"op": "info"})
+        self.sample_width = info["sample_width"]
+
+    def _connect(self, path):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.request_timeout)
+        sock.connect(path)
+        return sock
+
+    def _request(self, header, buffers=()):
+        connection = self._idle.get()
+        try:
+            try:
+                send_message(connection["sock"], header, buffers)
+                reply, _ = recv_message(connection["sock"])
+            except OSError:
+                # The worker may have been restarted; reconnect once
+                connection["sock"].close()
+                connection["sock"] = self._connect(connection["path"])
+                send_message(connection["sock"], header, buffers)
+                reply, _ = recv_message(connection["sock"])
+        finally:
+            self._idle.put(connection)
+        if "error" in reply:
+            raise RuntimeError(f"Inference service error: {reply['error']}")
+        return reply
+
+    def detect(self, frames):
+        frames = [np.ascontiguousarray(frame, dtype=np.uint8) for frame in frames]
+        reply = self._request({"op": "detect", "shapes": [list(frame.shape) for frame in frames]}, frames)
+        return reply["detections"]
@@ -0,0 +1,127 @@
+# components/inference_service.py
+"""Local out-of-process inference service for proctoring.
+
+Runs a pool of worker processes that each load the detector once and answer
+detection requests on their own Unix socket. Start it next to Streamlit and set
+DETECTOR_BACKEND=remote in the app's environment:
+
+    python -m components.inference_service --workers 4 --backend detr-int8
+    DETECTOR_BACKEND=remote streamlit run app.py
+"""
+import argparse
+import math
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+
+import numpy as np
+
+from components.detectors import DETECTOR_BACKEND, REMOTE_BACKEND, OnnxDetrDetector, create_detector
+from components.inference_client import INFERENCE_SOCKET_DIR, check_socket_dir, recv_message, send_message
+
+
+def handle_connection(conn, detector, detect_lock):
+    """Answers requests on one client connection until it closes."""
+    with conn:
+        while True:
+            try:
+                header, payload = recv_message(conn)
+            except (ConnectionError, OSError):
+                return
+            try:
+                if header["op"] == "info":
+                    reply = {"backend": detector.name, "sample_width": detector.sample_width}
+                elif header["op"] == "detect":
+                    frames, offset = [], 0
+                    for shape in header["shapes"]:
+                        size = math.prod(shape)
+                        frames.append(np.frombuffer(payload, dtype=np.uint8, count=size, offset=offset).reshape(shape))
+                        offset += size
+                    # One forward pass at a time; torch's intra-op threads use the worker's cores
+                    with detect_lock:
+                        reply = {"detections": detector.detect(frames)}
+                else:
+                    reply = {"error": f"Unknown op '{header['op']}'"}
+            except Exception as e:
+                reply = {"error": str(e)}
+            send_message(conn, reply)
+
+
+def run_worker(listener, backend, threads):
+    """Worker process: loads the detector once, then serves connections from its listening socket."""
+    if backend != OnnxDetrDetector.name:
+        # The ONNX backend never loads torch
+        import torch
+        torch.set_num_threads(threads)
+    started = time.perf_counter()
+    detector = create_detector(backend)
+    detector.detect([np.zeros((480, 640, 3), dtype=np.uint8)])
+    print(f"[worker {os.getpid()}] {backend} ready in {time.perf_counter() - started:.1f}s ({threads} threads).")
+
+    detect_lock = threading.Lock()
+    while True:
+        conn, _ = listener.accept()
+        threading.Thread(target=handle_connection, args=(conn, detector, detect_lock), daemon=True).start()
+
+
+def main():
+    cpu_count = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--socket-dir", default=INFERENCE_SOCKET_DIR)
+    parser.add_argument("--workers", type=int, default=max(1, cpu_count // 2))
+    parser.add_argument("--backend", default=DETECTOR_BACKEND if DETECTOR_BACKEND != REMOTE_BACKEND else "detr")
+    parser.add_argument("--threads-per-worker", type=int, default=None, help="torch threads per worker (default: cores / workers)")
+    args = parser.parse_args()
+    if args.backend == REMOTE_BACKEND:
+        parser.error("The inference service needs a local backend, not 'remote'.")
+    threads = args.threads_per_worker or max(1, cpu_count // args.workers)
+
+    # Private to this user; an existing directory is only reused if it passes the same check
+    os.makedirs(args.socket_dir, mode=0o700, exist_ok=True)
+    check_socket_dir(args.socket_dir)
+    # Every socket is bound before any model loads, so clients can connect right away
+    listeners = []
+    for i in range(args.workers):
+        path = os.path.join(args.socket_dir, f"detector-{i}.sock")
+        if os.path.exists(path):
+            os.unlink(path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(path)
+        listener.listen(64)
+        listeners.append((path, listener))
+
+    context = multiprocessing.get_context("spawn")
+
+    def start_worker(listener):
+        process = context.Process(target=run_worker, args=(listener, args.backend, threads), daemon=True)
+        process.start()
+        return process
+
+    processes = [start_worker(listener) for _, listener in listeners]
+    print(f"Inference service: {args.workers} {args.backend} workers on {args.socket_dir}")
+
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+    try:
+        # Restart workers that die; clients reconnect on their next request
+        while not stopping.wait(1.0):
+            for i, process in enumerate(processes):
+                if not process.is_alive():
+                    print(f"Worker {i} exited with code {process.exitcode}, restarting.")
+                    processes[i] = start_worker(listeners[i][1])
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            process.terminate()
+        for path, listener in listeners:
+            listener.close()
+            if os.path.exists(path):
+                os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
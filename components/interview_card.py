@@ -1,35 +1,46 @@
 # components/interview_card.py
-import streamlit as st
+import streamlit.components.v1 as components
 import time
 
 def show_interview_card(name, email, start_time):
-    """Displays a card in the top-left with user details and a running timer (DARK THEME)."""
-    
-    # Calculate elapsed time
-    if start_time:
-        elapsed_seconds = int(time.time() - start_time)
-        minutes = elapsed_seconds // 60
-        seconds = elapsed_seconds % 60
-        timer_text = f"{minutes:02d}:{seconds:02d}"
-    else:
-        timer_text = "00:00"
+    """Displays a card in the top-left with user details and a running timer (DARK THEME).
 
-    # Use st.markdown with a custom div for positioning and styling (Dark Theme CSS)
+    The timer ticks in the browser, so the page does not have to rerun every second.
+    """
+
+    # Elapsed time at render; the browser counts on from here, which avoids client clock skew
+    elapsed_seconds = int(time.time() - start_time) if start_time else 0
+    running = "true" if start_time else "false"
+
+    # Rendered in an iframe so the timer script can run (Dark Theme CSS)
     card_html = f"""
     <div style="
         background-color: #262730;
         color: #FAFAFA;
+        font-family: 'Source Sans Pro', sans-serif;
         border: 1px solid #444;
         border-radius: 10px;
         padding: 15px;
-        width: 100%;
         box-shadow: 0 4px 12px rgba(0,0,0,0.3);">
-        <h4 style="margin-bottom: 10px; color: #FFFFFF;">{name}</h4>
+        <h4 style="margin: 0 0 10px 0; color: #FFFFFF;">{name}</h4>
         <p style="font-size: 14px; color: #A0A0A0; margin-bottom: 15px;">{email}</p>
         <div style="font-size: 20px; font-weight: bold; text-align: center; background-color: #1A1A1A; border-radius: 5px; padding: 5px; color: #FAFAFA;">
             <span style="font-size:14px; font-weight:normal; color:#A0A0A0;">Time Elapsed:</span><br>
-            {timer_text}
+            <span id="timer">00:00</span>
         </div>
     </div>
+    <script>
+        const baseSeconds = {elapsed_seconds};
+        const renderedAt = Date.now();
+        const timer = document.getElementById("timer");
+        function tick() {{
+            const elapsed = {running} ? baseSeconds + Math.floor((Date.now() - renderedAt) / 1000) : 0;
+            const minutes = String(Math.floor(elapsed / 60)).padStart(2, "0");
+            const seconds = String(elapsed % 60).padStart(2, "0");
+            timer.textContent = minutes + ":" + seconds;
+        }}
+        tick();
+        if ({running}) setInterval(tick, 1000);
+    </script>
     """
-    st.markdown(card_html, unsafe_allow_html=True)  
\ No newline at end of file
+    components.html(card_html, height=190)
@@ -0,0 +1,80 @@
+# components/model_warmup.py
+import threading
+import time
+
+# Size of the blank frame pushed through the detector once it has loaded
+WARMUP_FRAME_SIZE = (480, 640)
+
+
+class DetectorWarmup:
+    """Loads the proctoring detector on a background thread, off the login page's critical path.
+
+    torch and transformers are only imported on that thread. After loading, one
+    dummy forward pass runs so weights are paged in and kernels are set up
+    before the first real frame. `ready` tells the UI whether the camera can
+    be offered yet.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self.status = "pending"  # pending -> loading -> ready | failed
+        self.error = None
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self._detector = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self.status == "pending":
+                self.status = "loading"
+                threading.Thread(target=self._run, name="detector-warmup", daemon=True).start()
+        return self
+
+    def _run(self):
+        started = time.perf_counter()
+        try:
+            import numpy as np
+            from components.detectors import DETECTOR_BACKEND, create_detector
+
+            detector = create_detector(self.backend or DETECTOR_BACKEND)
+            self.load_seconds = time.perf_counter() - started
+            dummy_frame = np.zeros((*WARMUP_FRAME_SIZE, 3), dtype=np.uint8)
+            detector.detect([dummy_frame])
+            self.warmup_seconds = time.perf_counter() - started - self.load_seconds
+            self._detector = detector
+            self.status = "ready"
+            print(f"Detector ready in {time.perf_counter() - started:.1f}s "
+                  f"(load {self.load_seconds:.1f}s, warm-up pass {self.warmup_seconds:.2f}s).")
+        except Exception as e:
+            self.error = e
+            self.status = "failed"
+            print(f"Detector warm-up failed: {e}")
+        finally:
+            self._done.set()
+
+    @property
+    def ready(self):
+        return self.status == "ready"
+
+    def wait(self, timeout=None):
+        """Blocks until warm-up finishes and returns the detector. Raises RuntimeError if loading failed or timed out."""
+        self.start()
+        if not self._done.wait(timeout):
+            raise RuntimeError("The proctoring detector is still loading.")
+        if self._detector is None:
+            raise RuntimeError(f"The proctoring detector failed to load: {self.error}")
+        return self._detector
+
+
+_warmup = None
+_warmup_lock = threading.Lock()
+
+def get_detector_warmup():
+    """Returns the process-wide DetectorWarmup, starting it on the first call."""
+    global _warmup
+    with _warmup_lock:
+        if _warmup is None:
+            _warmup = DetectorWarmup().start()
+        return _warmup
@@ -1,68 +1,147 @@
 # components/proctoring.py
 import streamlit as st
-from transformers import DetrImageProcessor, DetrForObjectDetection
-import torch
-from PIL import Image
 import av
+import threading
+import time
+import uuid
+from collections import Counter, deque
 from streamlit_webrtc import VideoProcessorBase
+from components.detection_server import DetectionServer
+from components.frame_sampler import AdaptiveSampler
+from components.model_warmup import get_detector_warmup
+from metrics import counter, timed
 
-# Load the model and processor from Hugging Face
-# This is done once and cached for performance
+# One detection server per process, shared by every candidate's camera.
+# The detector itself is loaded and warmed up in the background at process start.
 @st.cache_resource
-def load_model():
-    processor = DetrImageProcessor.from_pretrained("facebook/detr-resnet-50")
-    model = DetrForObjectDetection.from_pretrained("facebook/detr-resnet-50")
-    return processor, model
+def get_detection_server():
+    return DetectionServer(get_detector_warmup().wait())
+
+
+def sample_frame(frame, width):
+    """Downscales a frame to the detector's sample width as an RGB ndarray.
+
+    The resize and colorspace conversion happen in a single libswscale pass,
+    so the full-resolution frame is never copied into Python.
+    """
+    width = min(width, frame.width)
+    height = round(frame.height * width / frame.width / 2) * 2
+    return frame.to_ndarray(width=width, height=height, format="rgb24")
+
+
+def detection_to_message(detection):
+    """Turns a detection summary into the status shown to the candidate."""
+    if detection["person_count"] > 1:
+        return "Warning: Multiple people detected."
+    elif detection["phone_detected"]:
+        return "Warning: Cell phone detected."
+    elif detection["person_count"] == 0:
+        return "Warning: Candidate not detected."
+    return "Status: OK"
+
+
+class ViolationTracker:
+    """Debounces per-frame detection messages into discrete violation events.
+
+    A warning becomes active once it shows up in at least enter_count of the
+    last `window` results, and clears again once it is down to exit_count or
+    fewer. An event is emitted only when a warning becomes active, so a single
+    noisy frame never costs the candidate a strike.
+    """
+
+    def __init__(self, window=5, enter_count=3, exit_count=1):
+        self.enter_count = enter_count
+        self.exit_count = exit_count
+        self._history = deque(maxlen=window)
+        self.active = set()
+
+    def update(self, message, now=None):
+        """Records one detection message and returns the violation events it triggers."""
+        self._history.append(message)
+        counts = Counter(m for m in self._history if m.startswith("Warning"))
+
+        events = []
+        for warning, count in counts.items():
+            if warning not in self.active and count >= self.enter_count:
+                self.active.add(warning)
+                events.append({"message": warning, "timestamp": time.time() if now is None else now})
+        self.active = {w for w in self.active if counts[w] > self.exit_count}
+        return events
+
+    @property
+    def status(self):
+        """The debounced status: the most frequent active warning, or OK."""
+        if not self.active:
+            return "Status: OK"
+        counts = Counter(self._history)
+        return max(self.active, key=lambda w: counts[w])
 
-processor, model = load_model()
 
 class ProctoringProcessor(VideoProcessorBase):
     def __init__(self):
-        self.model = model
-        self.processor = processor
+        self.server = get_detection_server()
+        self.session_id = uuid.uuid4().hex
+        self.sampler = AdaptiveSampler(load_factor=self.server.load_factor)
+        self.tracker = ViolationTracker()
+        self._events = deque()
         self.warning_message = "No warnings."
         self.frame_count = 0
+        self.sampled_frames = 0
 
+        # Counters, updated under self._lock
+        self._lock = threading.Lock()
+        self.inference_count = 0
+        self.dropped_frames = 0
+        self.last_inference_ms = 0.0
+        self.total_inference_ms = 0.0
+
+    @timed("proctoring_recv_seconds", help_text="Time spent in ProctoringProcessor.recv per frame")
     def recv(self, frame: av.VideoFrame) -> av.VideoFrame:
-        # Convert the video frame to a PIL Image
-        img = frame.to_image()
-        
-        # Process every 10th frame to save resources
+        # Only frames the sampler picks go to the shared detection server
         self.frame_count += 1
-        if self.frame_count % 10 != 0:
-            return av.VideoFrame.from_image(img)
-
-        # Prepare the image for the model
-        inputs = self.processor(images=img, return_tensors="pt")
-        
-        # Get model outputs
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-
-        # Convert outputs to COCO API format and keep detections with score > 0.9
-        target_sizes = torch.tensor([img.size[::-1]])
-        results = self.processor.post_process_object_detection(outputs, target_sizes=target_sizes, threshold=0.9)[0]
-
-        person_count = 0
-        phone_detected = False
-        
-        # Check for detections
-        for score, label, box in zip(results["scores"], results["labels"], results["boxes"]):
-            label_name = self.model.config.id2label[label.item()]
-            
-            if label_name == 'person':
-                person_count += 1
-            if label_name == 'cell phone':
-                phone_detected = True
-
-        # Update warning message based on logic
-        if person_count > 1:
-            self.warning_message = "Warning: Multiple people detected."
-        elif phone_detected:
-            self.warning_message = "Warning: Cell phone detected."
-        elif person_count == 0:
-            self.warning_message = "Warning: Candidate not detected."
-        else:
-            self.warning_message = "Status: OK"
-            
-        return av.VideoFrame.from_image(img)
\ No newline at end of file
+        sampled = self.sampler.should_sample(frame)
+        counter("proctoring_frames_total", "Camera frames received by proctoring").inc(result="sampled" if sampled else "skipped")
+        if sampled:
+            self.sampled_frames += 1
+            if self.server.submit(self.session_id, sample_frame(frame, self.server.detector.sample_width), self._on_detection):
+                with self._lock:
+                    self.dropped_frames += 1
+
+        # The video itself is passed through untouched
+        return frame
+
+    def on_ended(self):
+        """Drops this session's pending frame when the WebRTC stream ends."""
+        self.server.unregister(self.session_id)
+
+    def pop_violation_events(self):
+        """Returns and clears the violation events raised since the last call."""
+        with self._lock:
+            events = list(self._events)
+            self._events.clear()
+        return events
+
+    def get_stats(self):
+        """Returns a consistent snapshot of the inference counters."""
+        with self._lock:
+            return {
+                "frames_received": self.frame_count,
+                "sampled_frames": self.sampled_frames,
+                "sample_interval": self.sampler.interval,
+                "motion_score": self.sampler.last_motion_score,
+                "inference_count": self.inference_count,
+                "dropped_frames": self.dropped_frames,
+                "last_inference_ms": self.last_inference_ms,
+                "avg_inference_ms": self.total_inference_ms / self.inference_count if self.inference_count else 0.0,
+            }
+
+    def _on_detection(self, detection, elapsed_ms):
+        # Called from the detection server's thread
+        message = detection_to_message(detection)
+        self.sampler.on_result(message.startswith("Warning"))
+        with self._lock:
+            self._events.extend(self.tracker.update(message))
+            self.warning_message = self.tracker.status
+            self.inference_count += 1
+            self.last_inference_ms = elapsed_ms
+            self.total_inference_ms += elapsed_ms
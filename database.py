@@ -1,12 +1,110 @@
 # database.py
 import sqlite3
 import datetime
+import hashlib
 import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
 
+from metrics import timed
+
+DB_PATH = os.environ.get("CANDIDATES_DB", "candidates.db")
+
+# Seconds a connection waits on a locked database before giving up
+BUSY_TIMEOUT = 5.0
+
+# Events that end an interview's log; sessions with one of these are never resumed
+CLOSING_EVENTS = ("finalized", "terminated")
+
+# Interview event logs untouched for this many days are deleted at startup,
+# along with the closing events left behind by finished interviews
+EVENT_RETENTION_DAYS = float(os.environ.get("EVENT_RETENTION_DAYS", 30))
+
+class ConnectionPool:
+    """A fixed-size, thread-safe pool of SQLite connections in WAL mode.
+
+    Connections are opened lazily and shared across threads (Streamlit runs each
+    script run on a new thread), so nothing is opened or closed per request.
+    Each connection caches its prepared statements.
+    """
+
+    def __init__(self, path, size=8):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, check_same_thread=False, cached_statements=256)
+        conn.row_factory = sqlite3.Row # This allows accessing columns by name
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(BUSY_TIMEOUT * 1000)}")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Borrows a connection; `with conn:` inside commits or rolls back a transaction."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self.size
+                if can_open:
+                    self._opened += 1
+            if can_open:
+                try:
+                    conn = self._open()
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            else:
+                conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+
+_pool = None
+_pool_lock = threading.Lock()
+# Held for the whole of init_db(), so concurrent first calls run the schema setup once
+_init_lock = threading.Lock()
+_initialized = False
+
+def get_pool():
+    """Returns the process-wide connection pool for DB_PATH."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(DB_PATH)
+        return _pool
+
+@timed("db_seconds", op="init_db")
 def init_db():
-    """Initializes the database and creates the candidates table if it doesn't exist."""
-    conn = sqlite3.connect('candidates.db')
-    cursor = conn.cursor()
+    """Initializes the database and creates the tables if they don't exist.
+
+    Runs once per process; later calls (e.g. on every Streamlit rerun) return immediately.
+    """
+    global _initialized
+    with _init_lock:
+        if _initialized:
+            return
+        with get_pool().connection() as conn, conn:
+            # Take the write lock before inspecting the schema, so another process
+            # initializing the same file at the same time waits instead of migrating twice
+            conn.execute("BEGIN IMMEDIATE")
+            _create_schema(conn.cursor())
+        _initialized = True
+
+def _create_schema(cursor):
+    """Creates and migrates every table inside init_db()'s transaction."""
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS candidates (
             userid TEXT PRIMARY KEY,
@@ -26,38 +124,247 @@ def init_db():
             final_percentage REAL NOT NULL,
             warning_count INTEGER NOT NULL,
             detailed_results TEXT,
+            evaluations_hash TEXT,
+            final_summary TEXT,
             FOREIGN KEY (userid) REFERENCES candidates (userid)
         )
     ''')
+    # Databases created before the summary columns existed
+    existing_columns = {row[1] for row in cursor.execute("PRAGMA table_info(interview_results)")}
+    for column in ("evaluations_hash", "final_summary"):
+        if column not in existing_columns:
+            cursor.execute(f"ALTER TABLE interview_results ADD COLUMN {column} TEXT")
+
+    # One row per answered question, so analytics don't have to decode detailed_results
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS interview_answers (
+            answer_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            result_id INTEGER NOT NULL,
+            question_id INTEGER NOT NULL,
+            topic TEXT,
+            level TEXT,
+            score INTEGER NOT NULL,
+            latency REAL,
+            answer TEXT,
+            FOREIGN KEY (result_id) REFERENCES interview_results (result_id)
+        )
+    ''')
+    # Databases created before answer text was stored
+    if "answer" not in {row[1] for row in cursor.execute("PRAGMA table_info(interview_answers)")}:
+        cursor.execute("ALTER TABLE interview_answers ADD COLUMN answer TEXT")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_results_userid ON interview_results (userid)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_results_timestamp ON interview_results (interview_timestamp)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_answers_result ON interview_answers (result_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_answers_topic ON interview_answers (topic)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_answers_question ON interview_answers (question_id)")
+
+    # Append-only log of in-progress interviews, replayed to resume after a crash (see session_log.py)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS interview_events (
+            event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            userid TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            created_at REAL NOT NULL
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_session ON interview_events (session_id, event_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_userid ON interview_events (userid, session_id)")
+
+    # The version bump commits together with the backfilled rows
+    schema_version = cursor.execute("PRAGMA user_version").fetchone()[0]
+    if schema_version < 1:
+        backfill_interview_answers(cursor)
+        cursor.execute("PRAGMA user_version = 1")
+
     # Check if the table is empty to add sample data once
     cursor.execute("SELECT COUNT(*) FROM candidates")
     if cursor.fetchone()[0] == 0:
         add_sample_data(cursor)
-    
-    conn.commit()
-    conn.close()
 
-def save_interview_results(userid, evaluations, warning_count):
-    """Calculates and saves the final interview results to the database."""
-    if not evaluations:
-        return
+    sweep_interview_events(cursor, time.time() - EVENT_RETENTION_DAYS * 24 * 3600)
+
+def sweep_interview_events(cursor, cutoff):
+    """Deletes the event logs of sessions whose latest event is older than cutoff (a Unix time)."""
+    deleted = cursor.execute('''
+        DELETE FROM interview_events WHERE session_id IN (
+            SELECT session_id FROM interview_events GROUP BY session_id HAVING MAX(created_at) < ?
+        )
+    ''', (cutoff,)).rowcount
+    if deleted:
+        print(f"Deleted {deleted} interview events older than the retention period.")
+
+def evaluations_hash(evaluations):
+    """Content hash of an interview's evaluations, used to key its final summary."""
+    return hashlib.sha256(json.dumps(evaluations, sort_keys=True).encode()).hexdigest()
+
+INSERT_RESULT_SQL = '''
+    INSERT INTO interview_results (userid, interview_timestamp, total_score, max_score, final_percentage, warning_count, detailed_results, evaluations_hash, final_summary)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+INSERT_ANSWER_SQL = '''
+    INSERT INTO interview_answers (result_id, question_id, topic, level, score, latency, answer)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+INSERT_EVENT_SQL = '''
+    INSERT INTO interview_events (session_id, userid, kind, payload, created_at)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+def answer_rows(result_id, evaluations):
+    """interview_answers rows for one interview's evaluations."""
+    return [
+        (result_id, item['id'], item.get('topic'), item.get('level'), item.get('score', 0), item.get('answer_latency'), item.get('answer'))
+        for item in evaluations if 'id' in item
+    ]
 
+def backfill_interview_answers(cursor):
+    """Fills interview_answers from the detailed_results JSON of interviews saved before it existed."""
+    rows = cursor.execute('''
+        SELECT result_id, detailed_results FROM interview_results
+        WHERE detailed_results IS NOT NULL
+          AND result_id NOT IN (SELECT DISTINCT result_id FROM interview_answers)
+    ''').fetchall()
+    for result_id, detailed_results in rows:
+        try:
+            evaluations = json.loads(detailed_results)
+        except json.JSONDecodeError:
+            print(f"Skipping unreadable detailed_results for result {result_id}.")
+            continue
+        cursor.executemany(INSERT_ANSWER_SQL, answer_rows(result_id, evaluations))
+    if rows:
+        print(f"Backfilled interview_answers for {len(rows)} interviews.")
+
+def score_totals(evaluations):
+    """(total_score, max_score, final_percentage) for an interview's evaluations."""
     total_score = sum(item.get('score', 0) for item in evaluations)
     max_score = len(evaluations) * 5  # Assuming each question is out of 5
     final_percentage = (total_score / max_score) * 100 if max_score > 0 else 0
+    return total_score, max_score, final_percentage
+
+@timed("db_seconds", op="save_interview_results")
+def save_interview_results(userid, evaluations, warning_count, final_summary=None, session_id=None):
+    """Calculates and saves the final interview results to the database. Returns the new result_id.
+
+    With a session_id, the interview's event log is closed in the same transaction.
+    """
+    if not evaluations:
+        if session_id is not None:
+            close_session(session_id, userid, "finalized", {"result_id": None})
+        return None
+
+    total_score, max_score, final_percentage = score_totals(evaluations)
     detailed_results_json = json.dumps(evaluations)
     timestamp = datetime.datetime.now().isoformat()
 
-    conn = sqlite3.connect('candidates.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO interview_results (userid, interview_timestamp, total_score, max_score, final_percentage, warning_count, detailed_results)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    ''', (userid, timestamp, total_score, max_score, final_percentage, warning_count, detailed_results_json))
-    
-    conn.commit()
-    conn.close()
+    with get_pool().connection() as conn, conn:
+        cursor = conn.execute(INSERT_RESULT_SQL, (
+            userid, timestamp, total_score, max_score, final_percentage, warning_count,
+            detailed_results_json, evaluations_hash(evaluations), final_summary
+        ))
+        result_id = cursor.lastrowid
+        conn.executemany(INSERT_ANSWER_SQL, answer_rows(result_id, evaluations))
+        if session_id is not None:
+            _close_session(conn, session_id, userid, "finalized", {"result_id": result_id})
     print(f"Results for user {userid} saved successfully.")
+    return result_id
+
+def iter_interview_results(after_id=0, page_size=200, since=None):
+    """Yields saved interviews (result_id, userid, interview_timestamp, evaluations, final_summary) in result_id order.
+
+    Reads one page at a time by result_id, so it streams any number of rows and
+    can resume after the last result_id it handed out.
+    """
+    while True:
+        with get_pool().connection() as conn:
+            rows = conn.execute('''
+                SELECT result_id, userid, interview_timestamp, detailed_results, final_summary
+                FROM interview_results
+                WHERE result_id > ? AND (? IS NULL OR interview_timestamp >= ?)
+                ORDER BY result_id
+                LIMIT ?
+            ''', (after_id, since, since, page_size)).fetchall()
+        for row in rows:
+            result = dict(row)
+            result["evaluations"] = json.loads(result.pop("detailed_results") or "[]")
+            yield result
+        if len(rows) < page_size:
+            return
+        after_id = rows[-1]["result_id"]
+
+def get_interview_results(result_ids):
+    """Returns the saved interviews with the given result_ids, in result_id order, shaped like iter_interview_results()."""
+    if not result_ids:
+        return []
+    with get_pool().connection() as conn:
+        rows = conn.execute(f'''
+            SELECT result_id, userid, interview_timestamp, detailed_results, final_summary
+            FROM interview_results
+            WHERE result_id IN ({",".join("?" * len(result_ids))})
+            ORDER BY result_id
+        ''', list(result_ids)).fetchall()
+    results = []
+    for row in rows:
+        result = dict(row)
+        result["evaluations"] = json.loads(result.pop("detailed_results") or "[]")
+        results.append(result)
+    return results
+
+@timed("db_seconds", op="update_rescored_results")
+def update_rescored_results(rescored):
+    """Writes re-graded interviews back in one transaction.
+
+    rescored is a list of {"result_id", "evaluations", "final_summary"} dicts.
+    With a final_summary of None the stored summary is kept only if the
+    evaluations are unchanged; otherwise it is cleared, since it would describe
+    the old grades. Scores, detailed_results and the interview_answers rows are
+    all replaced.
+    """
+    with get_pool().connection() as conn, conn:
+        for item in rescored:
+            evaluations = item["evaluations"]
+            total_score, max_score, final_percentage = score_totals(evaluations)
+            # SET expressions see the row's old values, so evaluations_hash here is the stored one
+            conn.execute('''
+                UPDATE interview_results
+                SET total_score = :total_score, max_score = :max_score, final_percentage = :final_percentage,
+                    detailed_results = :detailed_results, evaluations_hash = :evaluations_hash,
+                    final_summary = CASE
+                        WHEN :final_summary IS NOT NULL THEN :final_summary
+                        WHEN evaluations_hash = :evaluations_hash THEN final_summary
+                    END
+                WHERE result_id = :result_id
+            ''', {
+                "total_score": total_score, "max_score": max_score, "final_percentage": final_percentage,
+                "detailed_results": json.dumps(evaluations), "evaluations_hash": evaluations_hash(evaluations),
+                "final_summary": item.get("final_summary"), "result_id": item["result_id"],
+            })
+            conn.execute("DELETE FROM interview_answers WHERE result_id = ?", (item["result_id"],))
+            conn.executemany(INSERT_ANSWER_SQL, answer_rows(item["result_id"], evaluations))
+
+@timed("db_seconds", op="close_session")
+def close_session(session_id, userid, kind, payload):
+    """Ends an interview's log, so it is never offered for resuming, and drops its replay events."""
+    with get_pool().connection() as conn, conn:
+        _close_session(conn, session_id, userid, kind, payload)
+
+def _close_session(conn, session_id, userid, kind, payload):
+    conn.execute(INSERT_EVENT_SQL, (session_id, userid, kind, json.dumps(payload), time.time()))
+    # Only the closing event is kept; it stops late buffered events from reopening the
+    # session and is removed by the retention sweep
+    conn.execute(
+        f"DELETE FROM interview_events WHERE session_id = ? AND kind NOT IN ({', '.join('?' * len(CLOSING_EVENTS))})",
+        (session_id, *CLOSING_EVENTS),
+    )
+
+@timed("db_seconds", op="save_final_summary")
+def save_final_summary(result_id, final_summary):
+    """Stores the final summary for an already saved interview."""
+    with get_pool().connection() as conn, conn:
+        conn.execute("UPDATE interview_results SET final_summary = ? WHERE result_id = ?", (final_summary, result_id))
 
 def add_sample_data(cursor):
     """Adds a few sample candidates to the database for testing."""
@@ -69,17 +376,69 @@ def add_sample_data(cursor):
     cursor.executemany("INSERT INTO candidates VALUES (?, ?, ?, ?)", sample_users)
     print("Sample data added to the database.")
 
+@timed("db_seconds", op="verify_user")
 def verify_user(userid, password):
     """Verifies user credentials against the database."""
-    conn = sqlite3.connect('candidates.db')
-    conn.row_factory = sqlite3.Row # This allows accessing columns by name
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT * FROM candidates WHERE userid = ? AND password = ?", (userid, password))
-    user_data = cursor.fetchone()
-    
-    conn.close()
-    
+    with get_pool().connection() as conn:
+        user_data = conn.execute("SELECT * FROM candidates WHERE userid = ? AND password = ?", (userid, password)).fetchone()
+
     if user_data:
         return dict(user_data) # Return user data as a dictionary
-    return None
\ No newline at end of file
+    return None
+
+@timed("db_seconds", op="asked_question_ids")
+def asked_question_ids(userid):
+    """Ids of every question the user has answered in a saved interview."""
+    with get_pool().connection() as conn:
+        rows = conn.execute('''
+            SELECT DISTINCT a.question_id
+            FROM interview_answers a
+            JOIN interview_results r ON r.result_id = a.result_id
+            WHERE r.userid = ?
+        ''', (userid,)).fetchall()
+    return {row[0] for row in rows}
+
+# --- Recruiter analytics ---
+
+@timed("db_seconds", op="average_score_by_topic")
+def average_score_by_topic(since=None):
+    """Average score per topic, optionally only for interviews since an ISO timestamp."""
+    with get_pool().connection() as conn:
+        rows = conn.execute('''
+            SELECT a.topic, COUNT(*) AS answers, AVG(a.score) AS average_score
+            FROM interview_answers a
+            JOIN interview_results r ON r.result_id = a.result_id
+            WHERE ? IS NULL OR r.interview_timestamp >= ?
+            GROUP BY a.topic
+            ORDER BY average_score DESC
+        ''', (since, since)).fetchall()
+    return [dict(row) for row in rows]
+
+@timed("db_seconds", op="hardest_questions")
+def hardest_questions(limit=10, min_answers=1):
+    """Questions with the lowest average score, among those answered at least min_answers times."""
+    with get_pool().connection() as conn:
+        rows = conn.execute('''
+            SELECT question_id, topic, level, COUNT(*) AS answers, AVG(score) AS average_score
+            FROM interview_answers
+            GROUP BY question_id
+            HAVING COUNT(*) >= ?
+            ORDER BY average_score ASC, answers DESC
+            LIMIT ?
+        ''', (min_answers, limit)).fetchall()
+    return [dict(row) for row in rows]
+
+@timed("db_seconds", op="candidates_above")
+def candidates_above(percentage=80, since=None):
+    """Interviews scoring above a percentage, newest first. Pass since (e.g. a week ago) to limit the range."""
+    if isinstance(since, datetime.datetime):
+        since = since.isoformat()
+    with get_pool().connection() as conn:
+        rows = conn.execute('''
+            SELECT r.result_id, r.userid, c.name, c.email, r.interview_timestamp, r.final_percentage
+            FROM interview_results r
+            JOIN candidates c ON c.userid = r.userid
+            WHERE r.final_percentage > ? AND (? IS NULL OR r.interview_timestamp >= ?)
+            ORDER BY r.interview_timestamp DESC
+        ''', (percentage, since, since)).fetchall()
+    return [dict(row) for row in rows]
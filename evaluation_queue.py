@@ -0,0 +1,170 @@
+# evaluation_queue.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class EvaluationPool:
+    """A process-wide thread pool for evaluation jobs with a cap on queued work.
+
+    When max_pending jobs are already queued, submit() blocks until one finishes,
+    so a burst of candidates cannot grow the queue without bound.
+    """
+
+    def __init__(self, max_workers=8, max_pending=64):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="evaluation")
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def submit(self, fn, *args):
+        self._slots.acquire()
+        try:
+            future = self.executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+
+def run_with_retries(evaluate, question_data, answer, retries, backoff):
+    """Calls evaluate(question_data, answer), retrying failures with exponential backoff."""
+    for attempt in range(retries + 1):
+        try:
+            return evaluate(question_data, answer)
+        except Exception as e:
+            if attempt == retries:
+                raise
+            print(f"Evaluation of question {question_data.get('id')} failed ({e}), retrying.")
+            time.sleep(backoff * 2 ** attempt)
+
+
+class EvaluationQueue:
+    """Tracks one interview's evaluation jobs and hands results back in question order.
+
+    evaluate(question_data, answer) must return the evaluation dict and must not
+    touch st.session_state, since it runs on a pool thread. Question fields named
+    in omit_fields are left out of the merged results. on_result(evaluation), if
+    given, is called on the pool thread as soon as each job succeeds. A job that
+    runs past job_timeout is abandoned: its result is dropped even if it arrives later.
+    """
+
+    def __init__(self, pool, evaluate, retries=2, backoff=1.0, job_timeout=60.0, omit_fields=(), on_result=None):
+        self.pool = pool
+        self.evaluate = evaluate
+        self.retries = retries
+        self.backoff = backoff
+        self.job_timeout = job_timeout
+        self.omit_fields = set(omit_fields)
+        self.on_result = on_result
+        self._jobs = []  # {"question": dict, "answer": str, "future": Future, "submitted_at": float, "abandoned": bool}
+        self._merged = 0
+        # Decides, per job, between handing out a late result and abandoning it
+        self._lock = threading.Lock()
+        self.failed_jobs = 0
+
+    def submit(self, question_data, answer):
+        """Queues the grading of one answer and returns immediately."""
+        future = self.pool.submit(run_with_retries, self.evaluate, question_data, answer, self.retries, self.backoff)
+        job = {"question": question_data, "answer": answer, "future": future, "submitted_at": time.monotonic(), "abandoned": False}
+        self._jobs.append(job)
+        if self.on_result is not None:
+            future.add_done_callback(lambda _: self._notify(job))
+
+    def pop_ready(self):
+        """Returns evaluations for finished jobs at the front of the queue, in submission order.
+
+        Jobs that failed after all retries, or ran past job_timeout, are skipped.
+        """
+        ready = []
+        while self._merged < len(self._jobs):
+            job = self._jobs[self._merged]
+            if not job["future"].done():
+                if time.monotonic() - job["submitted_at"] < self.job_timeout:
+                    break
+                if self._abandon(job):
+                    self._record_failure(job, "timed out")
+                    self._merged += 1
+                    continue
+            try:
+                ready.append(self._merge(job))
+            except Exception as e:
+                self._record_failure(job, e)
+            self._merged += 1
+        return ready
+
+    def on_complete(self, callback):
+        """Calls callback(evaluations) once every job submitted so far has finished.
+
+        It always runs on a pool thread, never on the caller's, even if every job
+        is done already. evaluations are the successful results in submission order.
+        """
+        jobs = list(self._jobs)
+        if not jobs:
+            self.pool.executor.submit(callback, [])
+            return
+        lock = threading.Lock()
+        remaining = [len(jobs)]
+
+        def finish():
+            results = []
+            for job in jobs:
+                if job["abandoned"]:
+                    continue
+                try:
+                    results.append(self._merge(job))
+                except Exception:
+                    pass
+            callback(results)
+
+        def job_done(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            # add_done_callback runs inline for futures that are already done
+            self.pool.executor.submit(finish)
+
+        for job in jobs:
+            job["future"].add_done_callback(job_done)
+
+    def wait(self):
+        """Blocks until every outstanding job finishes or times out, then returns the remaining results."""
+        for job in self._jobs[self._merged:]:
+            remaining = job["submitted_at"] + self.job_timeout - time.monotonic()
+            try:
+                job["future"].result(timeout=max(remaining, 0))
+            except Exception:
+                pass  # Handled by pop_ready()
+        return self.pop_ready()
+
+    def _merge(self, job):
+        question = {k: v for k, v in job["question"].items() if k not in self.omit_fields}
+        # The answer text is kept so interviews can be re-graded later
+        return {**question, "answer": job["answer"], **job["future"].result()}
+
+    def _abandon(self, job):
+        """Marks an unfinished job as abandoned. Returns False if it finished in the meantime."""
+        with self._lock:
+            if job["future"].done():
+                return False
+            job["abandoned"] = True
+        # Only stops jobs that have not started; a running one finishes and is ignored
+        job["future"].cancel()
+        return True
+
+    def _notify(self, job):
+        with self._lock:
+            if job["abandoned"]:
+                return  # The session has already skipped this question
+            try:
+                evaluation = self._merge(job)
+            except Exception:
+                return  # Reported by pop_ready()
+        try:
+            self.on_result(evaluation)
+        except Exception as e:
+            print(f"on_result failed for question {job['question'].get('id')}: {e}")
+
+    def _record_failure(self, job, reason):
+        self.failed_jobs += 1
+        print(f"Skipping evaluation of question {job['question'].get('id')}: {reason}")
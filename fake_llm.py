@@ -0,0 +1,80 @@
+# fake_llm.py
+import os
+import random
+import threading
+import time
+
+# Canned replies per prompt type; anything else gets DEFAULT_REPLY
+MOCK_REPLIES = {
+    "GREETING": "Hello, I am Alex, an AI interviewer. Please introduce yourself.",
+    "INTRODUCTION": '{"name": "Candidate", "transition": "Great, thank you for that introduction. Let\'s begin with the first question."}',
+    "EVALUATION": '{"score": 3, "feedback": "This is mock feedback."}',
+    "EVALUATION_REPAIR": '{"score": 3, "feedback": "This is mock feedback."}',
+    "PSYCH_RESPONSE_TRANSITION": "Okay, noted. Let's review.",
+    "FINAL_SUMMARY": "This is a mock summary.",
+}
+DEFAULT_REPLY = "This is a generic mock response."
+
+
+class MockResponse:
+    """A canned stand-in for a generate_content response."""
+
+    def __init__(self, text):
+        self.text = text
+
+    # Iterating yields word chunks, so mocks also stand in for stream=True responses
+    def __iter__(self):
+        return (MockResponse(word + " ") for word in self.text.split())
+
+
+class FakeAPIError(Exception):
+    """An API error carrying an HTTP status in .code, like google.api_core exceptions."""
+
+    def __init__(self, code):
+        super().__init__(f"{code} Fake API error")
+        self.code = code
+
+
+class FakeLLM:
+    """Replaces the model in MOCK mode and in load tests: canned replies after a random delay.
+
+    Latency is log-normal around latency_ms (sigma=0 gives a fixed delay), and
+    error_rate of the calls fail with one of error_codes. Pass it to LLMClient
+    as `mock`, so retries, rate limits and hedging still run for real.
+    """
+
+    def __init__(self, latency_ms=500.0, sigma=0.0, error_rate=0.0, error_codes=(429, 503), seed=None):
+        self.latency_ms = latency_ms
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.error_codes = tuple(error_codes)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls):
+        """Configured by FAKE_LLM_LATENCY_MS, FAKE_LLM_SIGMA and FAKE_LLM_ERROR_RATE."""
+        return cls(
+            latency_ms=float(os.environ.get("FAKE_LLM_LATENCY_MS", 500)),
+            sigma=float(os.environ.get("FAKE_LLM_SIGMA", 0)),
+            error_rate=float(os.environ.get("FAKE_LLM_ERROR_RATE", 0)),
+        )
+
+    def __call__(self, prompt_type, text=None):
+        with self._lock:
+            self.calls += 1
+            delay = self.latency_ms / 1000 * self._random.lognormvariate(0, self.sigma) if self.sigma else self.latency_ms / 1000
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+                code = self._random.choice(self.error_codes)
+        time.sleep(delay)
+        if failed:
+            raise FakeAPIError(code)
+        return MockResponse(text if text is not None else MOCK_REPLIES.get(prompt_type, DEFAULT_REPLY))
+
+    def get_stats(self):
+        with self._lock:
+            return {"calls": self.calls, "errors": self.errors}
@@ -0,0 +1,61 @@
+# grading.py
+from metrics import counter
+from prompts import EVALUATION_PROMPT_TEMPLATE, EVALUATION_REPAIR_PROMPT_TEMPLATE
+from response_parsing import EvaluationSchema, parse_evaluation_response
+from scoring import score_locally
+
+# Seconds before a single evaluation call is abandoned
+EVALUATION_TIMEOUT = 30
+
+# Evaluations use JSON mode with a declared schema
+EVALUATION_GENERATION_CONFIG = {"response_mime_type": "application/json", "response_schema": EvaluationSchema}
+
+
+def record_reply(outcome):
+    """Counts evaluation replies by outcome: "parsed", "failed", "repaired" or "discarded".
+
+    failed / (parsed + failed) is the share of evaluation calls spent on unusable output.
+    """
+    counter("evaluation_replies_total", "LLM evaluation replies by parse outcome").inc(outcome=outcome)
+
+
+def grade_answer(llm, question_data, answer, reference_index=None, session_id=None, cacheable=True, hedge=True):
+    """Grades one answer: locally when it is a clear miss, otherwise with the LLM.
+
+    Shared by the live interview and the offline re-scoring CLI. Pass
+    reference_index=None to always use the LLM, and hedge=False for batch jobs
+    where latency does not matter. Raises LLMError or ValueError
+    if no usable evaluation comes back.
+    """
+    # Clear misses on easy/mid questions are graded without an API call
+    if reference_index is not None:
+        local_evaluation = score_locally(question_data, answer, reference_index)
+        if local_evaluation is not None:
+            return local_evaluation
+
+    prompt = EVALUATION_PROMPT_TEMPLATE.format(question=question_data['question'], answer=answer)
+    # Hedged by default: a slow evaluation holds up the candidate's final report
+    response = llm.generate(
+        prompt, "EVALUATION", session_id=session_id, cacheable=cacheable, validate=parse_evaluation_response,
+        generation_config=EVALUATION_GENERATION_CONFIG, deadline=EVALUATION_TIMEOUT, hedge=hedge, background=True
+    )
+    try:
+        evaluation = parse_evaluation_response(response.text)
+        record_reply("parsed")
+    except ValueError as e:
+        # One targeted repair instead of throwing away the paid call
+        record_reply("failed")
+        repair_prompt = EVALUATION_REPAIR_PROMPT_TEMPLATE.format(
+            error=e, previous_reply=response.text, question=question_data['question'], answer=answer
+        )
+        response = llm.generate(
+            repair_prompt, "EVALUATION_REPAIR", session_id=session_id,
+            generation_config=EVALUATION_GENERATION_CONFIG, deadline=EVALUATION_TIMEOUT, background=True
+        )
+        try:
+            evaluation = parse_evaluation_response(response.text)
+            record_reply("repaired")
+        except ValueError:
+            record_reply("discarded")
+            raise
+    return {**evaluation, "graded_by": "llm"}
@@ -0,0 +1,142 @@
+# llm_cache.py
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import counter
+
+# Prompt types that may be served from the cache, with their time-to-live in seconds.
+# Anything not listed here always goes to the model.
+CACHE_TTLS = {
+    "GREETING": 7 * 24 * 3600,
+    "PSYCH_RESPONSE_TRANSITION": 24 * 3600,
+    "EVALUATION": 30 * 24 * 3600,
+}
+
+
+class CachedResponse:
+    """Stands in for a generate_content response that was served from the cache."""
+
+    def __init__(self, text):
+        self.text = text
+
+    # Iterating yields word chunks, so cached responses also stand in for stream=True responses
+    def __iter__(self):
+        words = self.text.split(" ")
+        for i, word in enumerate(words):
+            yield CachedResponse(word if i == len(words) - 1 else word + " ")
+
+
+class LLMCache:
+    """Content-addressed cache of model responses.
+
+    Entries live in a small in-memory LRU in front of a SQLite table, so they
+    survive restarts and are shared by every session. Both tiers are capped in
+    size, and every entry expires after the TTL of its prompt type. The disk
+    tier evicts least recently used entries; hits update last_used in batches.
+    Hits and misses are counted in the llm_cache_lookups_total metric.
+    """
+
+    def __init__(self, db_path="llm_cache.db", max_memory_entries=512, max_disk_entries=20000, ttls=None):
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttls = CACHE_TTLS if ttls is None else ttls
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> (response, expires_at)
+        self._puts_since_trim = 0
+        self._touched = {}  # key -> time of its latest hit, not yet written to last_used
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                cache_key TEXT PRIMARY KEY,
+                prompt_type TEXT NOT NULL,
+                response TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        ''')
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache (last_used)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model_name, system_instruction, prompt, options=""):
+        """Hashes everything that determines the model's output into the cache key."""
+        payload = "\x1f".join([model_name or "", system_instruction or "", prompt, options])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def is_cacheable(self, prompt_type):
+        return prompt_type in self.ttls
+
+    def get(self, key, prompt_type):
+        """Returns the cached response text, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                row = self._conn.execute(
+                    "SELECT response, expires_at FROM llm_cache WHERE cache_key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = (row[0], row[1])
+                    self._remember(key, entry)
+            if entry is not None and entry[1] <= now:
+                self._memory.pop(key, None)
+                self._touched.pop(key, None)
+                self._conn.execute("DELETE FROM llm_cache WHERE cache_key = ?", (key,))
+                self._conn.commit()
+                entry = None
+
+            if entry is None:
+                counter("llm_cache_lookups_total", "Response cache lookups by result").inc(prompt_type=prompt_type, result="miss")
+                return None
+            self._memory.move_to_end(key)
+            self._touched[key] = now
+            if len(self._touched) >= 100:
+                self._flush_touched()
+                self._conn.commit()
+        counter("llm_cache_lookups_total").inc(prompt_type=prompt_type, result="hit")
+        return entry[0]
+
+    def put(self, key, prompt_type, response):
+        now = time.time()
+        expires_at = now + self.ttls[prompt_type]
+        with self._lock:
+            self._remember(key, (response, expires_at))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (cache_key, prompt_type, response, expires_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, prompt_type, response, expires_at, now),
+            )
+            self._touched.pop(key, None)
+            self._puts_since_trim += 1
+            # Trimming the table is a scan, so only do it every so often
+            if self._puts_since_trim >= 100:
+                self._trim_disk(now)
+            self._conn.commit()
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _flush_touched(self):
+        self._conn.executemany(
+            "UPDATE llm_cache SET last_used = ? WHERE cache_key = ?", [(t, k) for k, t in self._touched.items()]
+        )
+        self._touched.clear()
+
+    def _trim_disk(self, now):
+        self._puts_since_trim = 0
+        # Recent hits must count before anything is evicted by last_used
+        self._flush_touched()
+        self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+        self._conn.execute('''
+            DELETE FROM llm_cache WHERE cache_key IN (
+                SELECT cache_key FROM llm_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )
+        ''', (self.max_disk_entries,))
+
@@ -0,0 +1,281 @@
+# llm_client.py
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeoutError
+
+from llm_cache import CachedResponse
+from metrics import timed
+
+# HTTP status codes worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    """Raised when a model call fails for good: retries exhausted, deadline passed, or a non-retryable error."""
+
+
+def is_retryable(error):
+    """True for 429/5xx API errors (google.api_core exceptions carry the HTTP status in .code) and timeouts."""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    code = getattr(error, "code", None)
+    return isinstance(code, int) and code in RETRYABLE_STATUS_CODES
+
+
+class TokenBucket:
+    """Token-bucket rate limiter: `rate` requests per second with bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline):
+        """Takes one token, waiting if needed. Returns False if none is available before deadline."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class _ManagedStream:
+    """Wraps a streamed response so reading it behaves like the rest of the client.
+
+    Errors raised while chunks arrive become LLMError, and the in-flight slots
+    taken for the call are held until the stream is exhausted or closed. If
+    on_complete is set, it gets the full text once the stream completes.
+    """
+
+    def __init__(self, response, release):
+        self._response = response
+        self._release = release
+        self.on_complete = None
+
+    def __iter__(self):
+        parts = []
+        try:
+            for chunk in self._response:
+                try:
+                    parts.append(chunk.text)
+                except ValueError:
+                    pass
+                yield chunk
+        except Exception as e:
+            raise LLMError(f"Model stream failed: {e}") from e
+        finally:
+            self.close()
+        if self.on_complete is not None:
+            self.on_complete("".join(parts))
+
+    def close(self):
+        """Releases the call's in-flight slots; safe to call more than once."""
+        release, self._release = self._release, None
+        if release is not None:
+            release()
+
+    def __del__(self):
+        # A stream dropped without being read still gives its slots back
+        self.close()
+
+
+class LLMClient:
+    """The single entry point for every Gemini call in the app.
+
+    Each call goes through, in order: the response cache, a per-session limit
+    on background calls, a global in-flight limit, a token-bucket rate limiter,
+    and retries with exponential backoff and full jitter on 429/5xx errors.
+    All of it is bounded by a per-request deadline. Latency-critical calls can
+    be hedged: if the first attempt has not answered after hedge_delay seconds,
+    an identical backup request is sent and whichever succeeds first wins.
+
+    `model` is anything with a genai-compatible generate_content(), such as a
+    GenerativeModel pointed at a local fake server. Alternatively, `mock` is
+    called with the prompt type instead of the model, as in MOCK mode.
+    """
+
+    def __init__(self, model=None, mock=None, cache=None, model_name="", system_instruction="",
+                 max_in_flight=16, max_in_flight_per_session=2, requests_per_minute=60,
+                 deadline=30.0, max_retries=3, backoff_base=0.5, backoff_max=8.0, hedge_delay=3.0):
+        self.model = model
+        self.mock = mock
+        self.cache = cache
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+        self.max_in_flight_per_session = max_in_flight_per_session
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_delay = hedge_delay
+
+        self._global_slots = threading.BoundedSemaphore(max_in_flight)
+        self._sessions = threading.Condition()
+        self._session_in_flight = {}
+        self._bucket = TokenBucket(requests_per_minute / 60, capacity=max(1, min(max_in_flight, requests_per_minute)))
+        self._hedge_executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="llm-hedge")
+
+        self._stats_lock = threading.Lock()
+        self.stats = {"calls": 0, "cache_hits": 0, "retries": 0, "rate_limited": 0, "hedges": 0, "failures": 0}
+
+    def generate(self, prompt, prompt_type=None, session_id=None, stream=False, cacheable=True,
+                 validate=None, generation_config=None, deadline=None, hedge=False, background=False):
+        """Calls the model and returns its response (or a streamed response if stream=True).
+
+        Opted-in prompt types are served from and stored in the cache unless
+        cacheable=False. With validate, a response is only cached if
+        validate(text) does not raise. Raises LLMError when the call fails,
+        and iterating a streamed response raises LLMError if the stream breaks.
+
+        Only background=True calls (such as grading) count against the session's
+        max_in_flight_per_session, so a reply the candidate is waiting for never
+        queues behind that session's own grading jobs.
+        """
+        self._count("calls")
+        key = None
+        if self.cache is not None and cacheable and self.cache.is_cacheable(prompt_type):
+            key = self.cache.make_key(self.model_name, self.system_instruction, prompt, repr(generation_config))
+            cached = self.cache.get(key, prompt_type)
+            if cached is not None:
+                self._count("cache_hits")
+                return CachedResponse(cached)
+
+        deadline_at = time.monotonic() + (deadline or self.deadline)
+        call = (prompt, prompt_type, stream, generation_config, deadline_at)
+        limited_session = session_id if background else None
+        try:
+            # Includes rate-limit waits, retries and hedging; for streams, up to the first chunk
+            with timed("llm_request_seconds", session_id, "Model calls end to end", prompt_type=prompt_type):
+                if hedge and not stream:
+                    response = self._hedged_call(call, limited_session)
+                else:
+                    response = self._call_with_retries(call, limited_session)
+        except LLMError:
+            self._count("failures")
+            raise
+
+        if key is None:
+            return response
+        if stream:
+            response.on_complete = lambda text: self.cache.put(key, prompt_type, text)
+            return response
+        try:
+            if validate is not None:
+                validate(response.text)
+        except Exception:
+            return response
+        self.cache.put(key, prompt_type, response.text)
+        return response
+
+    def get_stats(self):
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _call_with_retries(self, call, session_id):
+        deadline_at = call[-1]
+        attempt = 0
+        while True:
+            try:
+                return self._call_once(call, session_id)
+            except LLMError:
+                raise
+            except Exception as e:
+                if getattr(e, "code", None) == 429:
+                    self._count("rate_limited")
+                if not is_retryable(e) or attempt >= self.max_retries:
+                    raise LLMError(f"Model call failed: {e}") from e
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                if time.monotonic() + delay >= deadline_at:
+                    raise LLMError(f"Model call failed before its deadline: {e}") from e
+                self._count("retries")
+                time.sleep(delay)
+                attempt += 1
+
+    def _call_once(self, call, session_id):
+        prompt, prompt_type, stream, generation_config, deadline_at = call
+        self._acquire_slots(session_id, deadline_at)
+        release = lambda: self._release_slots(session_id)
+        try:
+            if not self._bucket.acquire(deadline_at):
+                raise LLMError("Rate limit wait would exceed the request deadline.")
+            with timed("llm_attempt_seconds", help_text="Single generate_content attempts", prompt_type=prompt_type):
+                if self.mock is not None:
+                    response = self.mock(prompt_type)
+                else:
+                    kwargs = {"stream": stream, "request_options": {"timeout": max(deadline_at - time.monotonic(), 0.1)}}
+                    if generation_config is not None:
+                        kwargs["generation_config"] = generation_config
+                    response = self.model.generate_content(prompt, **kwargs)
+        except BaseException:
+            release()
+            raise
+        if stream:
+            # The slots stay taken while the body is read
+            return _ManagedStream(response, release)
+        release()
+        return response
+
+    def _hedged_call(self, call, session_id):
+        deadline_at = call[-1]
+        primary = self._hedge_executor.submit(self._call_with_retries, call, session_id)
+        try:
+            return primary.result(timeout=min(self.hedge_delay, max(deadline_at - time.monotonic(), 0)))
+        except FutureTimeoutError:
+            pass
+
+        # The backup skips the per-session limit, which the primary may be holding
+        self._count("hedges")
+        backup = self._hedge_executor.submit(self._call_with_retries, call, None)
+        error = None
+        try:
+            for future in as_completed([primary, backup], timeout=max(deadline_at - time.monotonic(), 0)):
+                try:
+                    return future.result()
+                except LLMError as e:
+                    error = e
+        except FutureTimeoutError:
+            raise LLMError("Hedged model call ran past its deadline.")
+        raise error
+
+    def _acquire_slots(self, session_id, deadline_at):
+        if session_id is not None:
+            with self._sessions:
+                while self._session_in_flight.get(session_id, 0) >= self.max_in_flight_per_session:
+                    remaining = deadline_at - time.monotonic()
+                    if remaining <= 0:
+                        raise LLMError("Too many requests in flight for this session.")
+                    self._sessions.wait(remaining)
+                self._session_in_flight[session_id] = self._session_in_flight.get(session_id, 0) + 1
+
+        if not self._global_slots.acquire(timeout=max(deadline_at - time.monotonic(), 0)):
+            self._release_session(session_id)
+            raise LLMError("Too many model requests in flight.")
+
+    def _release_slots(self, session_id):
+        self._global_slots.release()
+        self._release_session(session_id)
+
+    def _release_session(self, session_id):
+        if session_id is None:
+            return
+        with self._sessions:
+            count = self._session_in_flight.get(session_id, 0) - 1
+            if count > 0:
+                self._session_in_flight[session_id] = count
+            else:
+                self._session_in_flight.pop(session_id, None)
+            self._sessions.notify_all()
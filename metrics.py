@@ -0,0 +1,221 @@
+# metrics.py
+import bisect
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import ContextDecorator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Port for the Prometheus endpoint on 127.0.0.1; 0 disables it
+METRICS_PORT = int(os.environ.get("METRICS_PORT", 9464))
+
+# Upper bounds in seconds, the Prometheus client defaults plus 30s and 60s for slow model calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text or self.name}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+
+class Histogram:
+    """A Prometheus-style histogram: cumulative bucket counts, sum and count per label set."""
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self._series = {}  # label key -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            if i < len(self.buckets):
+                series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text or self.name}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_format_labels(key, [('le', bound)])} {cumulative}")
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', '+Inf')])} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {series[-2]}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series[-1]}")
+        return lines
+
+
+_metrics = OrderedDict()
+_metrics_lock = threading.Lock()
+
+def _get_or_create(cls, name, help_text, **kwargs):
+    with _metrics_lock:
+        metric = _metrics.get(name)
+        if metric is None:
+            metric = _metrics[name] = cls(name, help_text, **kwargs)
+        elif help_text and not metric.help_text:
+            metric.help_text = help_text
+        return metric
+
+def counter(name, help_text=""):
+    """Returns the process-wide counter called name, creating it on first use."""
+    return _get_or_create(Counter, name, help_text)
+
+def histogram(name, help_text="", buckets=DEFAULT_BUCKETS):
+    """Returns the process-wide histogram called name, creating it on first use."""
+    return _get_or_create(Histogram, name, help_text, buckets=buckets)
+
+def render_prometheus():
+    """Every metric in the Prometheus text exposition format."""
+    with _metrics_lock:
+        metrics = list(_metrics.values())
+    return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+class SessionTraces:
+    """The most recent timed steps of each interview, kept for dumping slow ones.
+
+    Bounded in both directions: max_sessions interviews (least recently active
+    dropped first) and max_events steps per interview.
+    """
+
+    def __init__(self, max_sessions=500, max_events=500):
+        self.max_sessions = max_sessions
+        self.max_events = max_events
+        self._traces = OrderedDict()  # session_id -> deque of events
+        self._lock = threading.Lock()
+
+    def record(self, session_id, name, seconds, labels):
+        event = {"name": name, "at": time.time(), "seconds": round(seconds, 4), **labels}
+        with self._lock:
+            trace = self._traces.get(session_id)
+            if trace is None:
+                trace = self._traces[session_id] = deque(maxlen=self.max_events)
+                if len(self._traces) > self.max_sessions:
+                    self._traces.popitem(last=False)
+            else:
+                self._traces.move_to_end(session_id)
+            trace.append(event)
+
+    def get(self, session_id):
+        with self._lock:
+            return list(self._traces.get(session_id, ()))
+
+    def pop(self, session_id):
+        with self._lock:
+            return list(self._traces.pop(session_id, ()))
+
+session_traces = SessionTraces()
+
+
+class timed(ContextDecorator):
+    """Times a block or function into the histogram called name, in seconds.
+
+    With a session_id the step is also added to that interview's trace. Works
+    as `with timed("db_seconds", op="save"):` or as `@timed("db_seconds", op="save")`.
+    """
+
+    def __init__(self, name, session_id=None, help_text="", **labels):
+        self.name = name
+        self.session_id = session_id
+        self.help_text = help_text
+        self.labels = labels
+
+    def _recreate_cm(self):
+        # A fresh timer per decorated call, so concurrent calls don't share a start time
+        return timed(self.name, self.session_id, self.help_text, **self.labels)
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._started
+        labels = {**self.labels, "outcome": "error" if exc_type else "ok"}
+        histogram(self.name, self.help_text).observe(elapsed, **labels)
+        if self.session_id is not None:
+            session_traces.record(self.session_id, self.name, elapsed, labels)
+        return False
+
+
+def dump_session_trace(session_id, path):
+    """Writes an interview's trace to path as JSON and forgets it. Returns the number of steps."""
+    trace = session_traces.pop(session_id)
+    with open(path, "w") as f:
+        json.dump({"session_id": session_id, "total_seconds": round(sum(e["seconds"] for e in trace), 3), "steps": trace}, f, indent=2)
+    return len(trace)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes every few seconds would flood the console
+
+
+_server = None
+_server_attempted = False
+_server_lock = threading.Lock()
+
+def start_metrics_server(port=METRICS_PORT, host="127.0.0.1"):
+    """Serves /metrics on a background thread. Safe to call on every rerun; only the first call starts it."""
+    global _server, _server_attempted
+    with _server_lock:
+        if _server_attempted or not port:
+            return _server
+        _server_attempted = True
+        try:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError as e:
+            print(f"Metrics endpoint not started on port {port}: {e}")
+            return None
+        threading.Thread(target=_server.serve_forever, daemon=True).start()
+        print(f"Metrics available at http://{host}:{port}/metrics")
+        return _server
@@ -68,4 +68,26 @@ FINAL_REPORT_PROMPT_TEMPLATE = """
 **Persona:** You are a senior hiring manager.
 **Interview Data:** {evaluations}
 **Your Task:** Write a final performance summary paragraph based on the data.
-"""
\ No newline at end of file
+"""
+
+# Combines name extraction and the transition phrase into a single call
+INTRODUCTION_PROMPT_TEMPLATE = """
+You are the interviewer, Alex. The candidate has just introduced themselves:
+"{introduction}"
+
+**Your Task:**
+Respond in a pure JSON format with two keys:
+- "name": the candidate's first name, or "Candidate" if a name is not clearly mentioned.
+- "transition": a short, encouraging transition phrase before starting the first question. Use their real name if you found one. If the name is "Candidate", use a generic greeting like "Great, thank you for that introduction. Let's begin with the first question." and do NOT use the word 'Candidate'.
+"""
+
+# Sent once when an evaluation reply fails schema validation
+EVALUATION_REPAIR_PROMPT_TEMPLATE = """
+Your previous evaluation could not be used: {error}
+Previous reply: {previous_reply}
+
+**Context:** The candidate was asked: "{question}"
+**Candidate's Answer:** "{answer}"
+
+Reply again with ONLY a JSON object with two keys: "score" (integer 1-5) and "feedback" (a brief, constructive sentence). No other text.
+"""
@@ -0,0 +1,120 @@
+# question_bank.py
+import json
+import os
+import random
+import threading
+from collections import defaultdict
+
+# The interview mix: (levels a question may come from, how many to ask)
+QUESTION_MIX = [(("hard",), 2), (("easy", "mid"), 8)]
+
+# Random draws from a topic before falling back to a scan for an unused question
+MAX_DRAW_ATTEMPTS = 8
+
+
+class QuestionBank:
+    """questions.json loaded once and indexed by level and topic.
+
+    select() samples each level group stratum by stratum, cycling through the
+    topics in random order so an interview covers as many topics as possible.
+    Topics already used by an earlier stratum are only drawn from again once a
+    stratum has run out of new ones.
+    Its cost grows with the number of questions asked and the number of topics,
+    not with the size of the bank.
+    """
+
+    def __init__(self, questions, mtime=None):
+        self.questions = questions
+        self.mtime = mtime
+        self.by_id = {q['id']: q for q in questions}
+        self.by_level = defaultdict(lambda: defaultdict(list))  # level -> topic -> [question]
+        for q in questions:
+            self.by_level[q['level']][q.get('topic')].append(q)
+
+    @classmethod
+    def load(cls, path):
+        mtime = os.stat(path).st_mtime
+        with open(path) as f:
+            return cls(json.load(f), mtime)
+
+    def select(self, mix=QUESTION_MIX, exclude_ids=()):
+        """Returns a shuffled interview of questions following mix.
+
+        Questions in exclude_ids (e.g. the ones a returning candidate has already
+        seen) are only used if a level group would otherwise run out.
+        """
+        chosen_ids = set()
+        used_topics = set()
+        selected = []
+        for levels, count in mix:
+            topics = defaultdict(list)  # topic -> [question list per level]
+            for level in levels:
+                for topic, bucket in self.by_level.get(level, {}).items():
+                    topics[topic].append(bucket)
+            picked = self._sample_stratum(topics, count, chosen_ids | set(exclude_ids), used_topics)
+            if len(picked) < count:
+                print(f"Not enough unseen {'/'.join(levels)} questions, allowing repeats.")
+                picked += self._sample_stratum(
+                    topics, count - len(picked), chosen_ids | {q['id'] for q in picked},
+                    used_topics | {q.get('topic') for q in picked}
+                )
+            if len(picked) < count:
+                raise ValueError(f"The question bank has fewer than {count} {'/'.join(levels)} questions.")
+            chosen_ids.update(q['id'] for q in picked)
+            used_topics.update(q.get('topic') for q in picked)
+            selected += picked
+        random.shuffle(selected)
+        return selected
+
+    def _sample_stratum(self, topics, count, skip_ids, used_topics=()):
+        """Draws up to count questions, one topic at a time, never returning an id in skip_ids.
+
+        Topics not in used_topics come first in every pass, so a used topic is
+        only repeated when there are not enough new ones.
+        """
+        picked = []
+        skip_ids = set(skip_ids)
+        new_topics = [t for t in topics if t not in used_topics]
+        old_topics = [t for t in topics if t in used_topics]
+        topic_order = random.sample(new_topics, len(new_topics)) + random.sample(old_topics, len(old_topics))
+        while len(picked) < count and topic_order:
+            for topic in list(topic_order):
+                question = self._draw(topics[topic], skip_ids)
+                if question is None:
+                    topic_order.remove(topic)
+                    continue
+                picked.append(question)
+                skip_ids.add(question['id'])
+                if len(picked) == count:
+                    break
+        return picked
+
+    def _draw(self, buckets, skip_ids):
+        """A random question from a topic's buckets that is not in skip_ids, or None if there is none."""
+        total = sum(len(bucket) for bucket in buckets)
+        for _ in range(MAX_DRAW_ATTEMPTS):
+            i = random.randrange(total)
+            for bucket in buckets:
+                if i < len(bucket):
+                    break
+                i -= len(bucket)
+            if bucket[i]['id'] not in skip_ids:
+                return bucket[i]
+        # Nearly exhausted topic: scan it once
+        unused = [q for bucket in buckets for q in bucket if q['id'] not in skip_ids]
+        return random.choice(unused) if unused else None
+
+
+_banks = {}
+_banks_lock = threading.Lock()
+
+def get_question_bank(path="questions.json"):
+    """Returns the process-wide QuestionBank for path, reloading it when the file changes."""
+    mtime = os.stat(path).st_mtime
+    with _banks_lock:
+        bank = _banks.get(path)
+        if bank is None or bank.mtime != mtime:
+            bank = QuestionBank.load(path)
+            _banks[path] = bank
+            print(f"Loaded {len(bank.questions)} questions from {path}.")
+        return bank
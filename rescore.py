@@ -0,0 +1,210 @@
+# rescore.py
+"""Re-grades stored interviews after a change to the evaluation prompt or scoring rubric.
+
+Streams interview_results in result_id order and grades every stored answer
+again through the same pipeline as the live app (local scorer, then the LLM),
+with bounded concurrency. Each batch of interviews is written back in one
+transaction, and a checkpoint file records progress, so an interrupted run
+picks up where it stopped and retries the interviews that failed. The
+checkpoint is tied to the database, prompts, model and options of the run that
+wrote it, and is deleted once a run finishes with no failures. Interviews saved
+before answer text was stored cannot be re-graded and are skipped.
+
+    python rescore.py --concurrency 16                   # Gemini (GOOGLE_API_KEY)
+    python rescore.py --mock --dry-run                   # fake LLM, nothing written
+    python rescore.py --summaries --since 2025-01-01     # also regenerate final reports
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import database
+from fake_llm import FakeLLM
+from grading import grade_answer
+from llm_cache import LLMCache
+from llm_client import LLMClient
+from prompts import EVALUATION_PROMPT_TEMPLATE, FINAL_REPORT_PROMPT_TEMPLATE, INTERVIEWER_PERSONA
+from question_bank import get_question_bank
+from scoring import REFERENCE_FIELDS, ReferenceIndex
+
+# Keys produced by grading; everything else in a stored evaluation is question data
+GRADE_FIELDS = ("score", "feedback", "graded_by")
+
+
+def build_llm_client(args):
+    if args.mock:
+        return LLMClient(mock=FakeLLM.from_env(), requests_per_minute=args.rpm, max_in_flight=args.concurrency)
+    import google.generativeai as genai
+    genai.configure(api_key=os.environ["GOOGLE_API_KEY"])
+    return LLMClient(
+        model=genai.GenerativeModel(model_name=args.model, system_instruction=INTERVIEWER_PERSONA),
+        cache=None if args.no_cache else LLMCache(), model_name=args.model, system_instruction=INTERVIEWER_PERSONA,
+        requests_per_minute=args.rpm, max_in_flight=args.concurrency,
+    )
+
+
+def job_key(args):
+    """Identifies a re-grading job: a checkpoint only applies to a run with the same key."""
+    job = {
+        "db": os.path.abspath(args.db),
+        "prompts": [INTERVIEWER_PERSONA, EVALUATION_PROMPT_TEMPLATE, FINAL_REPORT_PROMPT_TEMPLATE],
+        "model": "mock" if args.mock else args.model,
+        "llm_only": args.llm_only,
+        "since": args.since,
+        "summaries": args.summaries,
+    }
+    return hashlib.sha256(json.dumps(job, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def load_checkpoint(path, job):
+    if path and os.path.exists(path):
+        with open(path) as f:
+            checkpoint = json.load(f)
+        if checkpoint.get("job") == job:
+            return checkpoint
+        print(f"Ignoring {path}: it belongs to a different database, prompt, model or options.")
+    return {"job": job, "last_result_id": 0, "rescored": 0, "skipped": 0, "failed": []}
+
+
+def save_checkpoint(path, checkpoint):
+    """Replaces the checkpoint file atomically, so a crash never leaves half of one."""
+    if not path:
+        return
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class Rescorer:
+    def __init__(self, llm, executor, questions_by_id, reference_index, summaries):
+        self.llm = llm
+        self.executor = executor
+        self.questions_by_id = questions_by_id
+        self.reference_index = reference_index
+        self.summaries = summaries
+
+    def regrade(self, evaluation):
+        """Grades one stored evaluation again. Returns the updated evaluation."""
+        question_data = {k: v for k, v in evaluation.items() if k not in GRADE_FIELDS}
+        # Reference fields are left out of stored evaluations; take them from the current bank
+        reference = self.questions_by_id.get(evaluation.get("id"), {})
+        question_data.update({k: reference[k] for k in REFERENCE_FIELDS if k in reference})
+        result = grade_answer(self.llm, question_data, evaluation["answer"], self.reference_index, hedge=False)
+        stored = {k: v for k, v in question_data.items() if k not in REFERENCE_FIELDS}
+        return {**stored, **result}
+
+    def summarize(self, evaluations):
+        prompt = FINAL_REPORT_PROMPT_TEMPLATE.format(evaluations=json.dumps(evaluations))
+        return self.llm.generate(prompt, "FINAL_SUMMARY").text
+
+    def process(self, interviews):
+        """Re-grades a batch of interviews concurrently.
+
+        Returns (rescored, skipped_ids, failed_ids); rescored items are ready for
+        database.update_rescored_results().
+        """
+        skipped, pending = [], []
+        for interview in interviews:
+            evaluations = interview["evaluations"]
+            if not evaluations or any("answer" not in e for e in evaluations):
+                skipped.append(interview["result_id"])
+                continue
+            pending.append((interview, [self.executor.submit(self.regrade, e) for e in evaluations]))
+
+        rescored, failed = [], []
+        for interview, futures in pending:
+            try:
+                rescored.append({"result_id": interview["result_id"], "evaluations": [f.result() for f in futures], "final_summary": None})
+            except Exception as e:
+                print(f"Interview {interview['result_id']} kept its old grades: {e}")
+                failed.append(interview["result_id"])
+
+        if self.summaries:
+            summary_futures = [self.executor.submit(self.summarize, item["evaluations"]) for item in rescored]
+            for item, future in zip(rescored, summary_futures):
+                try:
+                    item["final_summary"] = future.result()
+                except Exception as e:
+                    print(f"Interview {item['result_id']} has no new summary: {e}")
+        return rescored, skipped, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=database.DB_PATH)
+    parser.add_argument("--since", help="only interviews at or after this ISO timestamp")
+    parser.add_argument("--concurrency", type=int, default=8, help="answers graded at the same time")
+    parser.add_argument("--batch-size", type=int, default=50, help="interviews per write-back transaction")
+    parser.add_argument("--checkpoint", default="rescore_checkpoint.json", help="progress file ('' to disable)")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    parser.add_argument("--summaries", action="store_true", help="also regenerate each final summary (otherwise summaries of changed grades are cleared)")
+    parser.add_argument("--llm-only", action="store_true", help="skip the local scorer")
+    parser.add_argument("--mock", action="store_true", help="grade with the fake LLM (FAKE_LLM_* settings)")
+    parser.add_argument("--no-cache", action="store_true", help="bypass the LLM response cache")
+    parser.add_argument("--dry-run", action="store_true", help="grade but write nothing back")
+    parser.add_argument("--model", default="gemini-1.5-flash")
+    parser.add_argument("--rpm", type=int, default=60, help="LLM requests per minute")
+    args = parser.parse_args()
+
+    database.DB_PATH = args.db
+    database.init_db()
+    checkpoint = load_checkpoint(None if args.restart else args.checkpoint, job_key(args))
+    bank = get_question_bank()
+    reference_index = None if args.llm_only else ReferenceIndex(bank.questions)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="rescore") as executor:
+        rescorer = Rescorer(build_llm_client(args), executor, bank.by_id, reference_index, args.summaries)
+
+        def flush(batch, advance=True):
+            rescored, skipped, failed = rescorer.process(batch)
+            if rescored and not args.dry_run:
+                database.update_rescored_results(rescored)
+            if advance:
+                checkpoint["last_result_id"] = batch[-1]["result_id"]
+            checkpoint["rescored"] += len(rescored)
+            checkpoint["skipped"] += len(skipped)
+            checkpoint["failed"] += failed
+            if not args.dry_run:
+                save_checkpoint(args.checkpoint, checkpoint)
+            elapsed = time.perf_counter() - started
+            print(f"up to result {checkpoint['last_result_id']}: {checkpoint['rescored']} re-graded, "
+                  f"{checkpoint['skipped']} skipped, {len(checkpoint['failed'])} failed ({elapsed:.0f}s)")
+
+        # Interviews that failed in an earlier run are retried first; ones that fail again stay listed
+        failed_before = list(checkpoint["failed"])
+        if failed_before:
+            print(f"Retrying {len(failed_before)} interviews that failed last time.")
+        for i in range(0, len(failed_before), args.batch_size):
+            retry_ids = set(failed_before[i:i + args.batch_size])
+            checkpoint["failed"] = [result_id for result_id in checkpoint["failed"] if result_id not in retry_ids]
+            batch = database.get_interview_results(retry_ids)
+            if batch:
+                flush(batch, advance=False)
+
+        batch = []
+        for interview in database.iter_interview_results(after_id=checkpoint["last_result_id"], since=args.since):
+            batch.append(interview)
+            if len(batch) == args.batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+
+    if args.dry_run:
+        print(f"Done in {time.perf_counter() - started:.1f}s. (dry run, nothing written)")
+        return
+    if checkpoint["failed"]:
+        print(f"{len(checkpoint['failed'])} interviews failed; run again to retry them.")
+    elif args.checkpoint and os.path.exists(args.checkpoint):
+        # The job is finished; the next run (e.g. after a prompt change) starts from the beginning
+        os.remove(args.checkpoint)
+    print(f"Done in {time.perf_counter() - started:.1f}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# response_parsing.py
+import json
+import re
+from typing import TypedDict
+
+# Phrases candidates use to introduce themselves, followed by the name
+NAME_PATTERNS = [
+    r"\bmy name is\s+([a-z][a-z'\-]*)",
+    r"\bmy name's\s+([a-z][a-z'\-]*)",
+    r"\bcall me\s+([a-z][a-z'\-]*)",
+    r"\bthis is\s+([a-z][a-z'\-]*)",
+    r"\bi['’]?m\s+([a-z][a-z'\-]*)",
+    r"\bi am\s+([a-z][a-z'\-]*)",
+]
+
+# Words that follow "I'm" / "I am" / "this is" but are not names
+NOT_NAMES = {
+    "a", "an", "the", "from", "here", "in", "at", "on", "working", "currently", "not", "very",
+    "really", "so", "excited", "happy", "glad", "good", "fine", "great", "ready", "interested",
+    "looking", "applying", "new", "also", "just", "still", "my", "your", "me", "it", "going",
+}
+
+
+def extract_name_locally(text):
+    """Finds a first name in an introduction like "my name is X" or "I'm X".
+
+    Returns "Candidate" when no name can be found, matching NAME_EXTRACTION_PROMPT_TEMPLATE.
+    """
+    lowered = text.lower()
+    for pattern in NAME_PATTERNS:
+        for match in re.finditer(pattern, lowered):
+            name = match.group(1).strip("'-")
+            if name and name not in NOT_NAMES:
+                return name.capitalize()
+    return "Candidate"
+
+
+def default_transition(name):
+    """The transition used when the model's reply cannot be used."""
+    if name == "Candidate":
+        return "Great, thank you for that introduction. Let's begin with the first question."
+    return f"Thank you for the introduction, {name}. Let's begin with the first question."
+
+
+def extract_first_json_object(text):
+    """Returns the first balanced {...} in text, or None if there is none (yet).
+
+    Braces inside JSON strings are ignored, and anything before the object (such
+    as a ```json fence) or after it is skipped. It can be called on a partially
+    streamed reply: None means the object is not complete yet.
+    """
+    start = text.find("{")
+    if start == -1:
+        return None
+    depth, in_string, escaped = 0, False, False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+
+def load_json_object(text):
+    """Parses the first JSON object in a model reply, ignoring fences and trailing text."""
+    json_str = extract_first_json_object(text)
+    if json_str is None:
+        raise ValueError("No complete JSON object in the reply.")
+    return json.loads(json_str)
+
+
+def parse_introduction_response(text):
+    """Validates the INTRODUCTION_PROMPT_TEMPLATE reply and returns {"name": str, "transition": str}.
+
+    Raises ValueError if the reply does not match the schema.
+    """
+    data = load_json_object(text)
+    name, transition = data.get("name"), data.get("transition")
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("'name' must be a non-empty string.")
+    if not isinstance(transition, str) or not transition.strip():
+        raise ValueError("'transition' must be a non-empty string.")
+    return {"name": name.strip(), "transition": transition.strip()}
+
+
+class EvaluationSchema(TypedDict):
+    """Response schema declared to the model for EVALUATION_PROMPT_TEMPLATE."""
+    score: int
+    feedback: str
+
+
+def parse_evaluation_response(text):
+    """Validates an evaluation reply and returns {"score": int 1-5, "feedback": str}.
+
+    Numeric strings and whole floats are accepted as scores. Raises ValueError
+    if the reply does not match the schema.
+    """
+    data = load_json_object(text)
+    score, feedback = data.get("score"), data.get("feedback")
+    if isinstance(score, str) and score.strip().isdigit():
+        score = int(score.strip())
+    if isinstance(score, float) and score.is_integer():
+        score = int(score)
+    if isinstance(score, bool) or not isinstance(score, int) or not 1 <= score <= 5:
+        raise ValueError(f"'score' must be an integer from 1 to 5, got {score!r}.")
+    if not isinstance(feedback, str) or not feedback.strip():
+        raise ValueError("'feedback' must be a non-empty string.")
+    return {"score": score, "feedback": feedback.strip()}
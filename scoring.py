@@ -0,0 +1,107 @@
+# scoring.py
+import math
+import re
+from collections import Counter
+
+# Question fields used only for grading; they are kept out of stored evaluations
+REFERENCE_FIELDS = ("key_concepts", "reference_answer")
+
+# Only these levels are graded locally; harder questions always go to the LLM
+LOCAL_SCORING_LEVELS = ("easy", "mid")
+
+# Below this similarity, an answer with no key concept is a clear miss. Keyword
+# overlap cannot tell a good answer from a salad of the right words, so answers
+# are never awarded points locally; anything that is not a clear miss is escalated.
+NO_COVERAGE_SIMILARITY = 0.10
+
+GIVING_UP_PATTERN = re.compile(
+    r"\b(i\s+(?:do\s*n[o']?t|dont)\s+know|no\s+idea|not\s+sure|can'?t\s+remember|cannot\s+remember|i\s+forgot|skip|pass)\b"
+)
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "is", "it", "its", "that", "this", "with",
+    "as", "by", "be", "are", "you", "your", "i", "we", "can", "would", "will", "then", "so", "if", "from",
+    "at", "which", "when", "what", "how", "do", "does", "use", "using", "into", "all", "each", "like",
+}
+
+
+def normalize(text):
+    """Lowercases text and collapses whitespace and curly quotes."""
+    text = text.lower().replace("’", "'").replace("“", '"').replace("”", '"')
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _stem(token):
+    for suffix in ("ing", "ed", "es", "s"):
+        if len(token) > len(suffix) + 2 and token.endswith(suffix):
+            return token[: -len(suffix)]
+    return token
+
+
+def tokenize(text):
+    return [_stem(t) for t in re.findall(r"[a-z0-9]+", normalize(text)) if t not in STOPWORDS]
+
+
+def keyword_present(keyword, text):
+    """Matches a keyword phrase on word boundaries, allowing simple inflections (count -> counts)."""
+    keyword = normalize(keyword)
+    if not re.search(r"[a-z0-9]", keyword):
+        return keyword in text
+    pattern = re.escape(keyword)
+    if keyword[0].isalnum():
+        pattern = r"(?<![a-z0-9])" + pattern
+    if keyword[-1].isalpha():
+        pattern += r"(?:s|es|ed|ing)?(?![a-z0-9])"
+    return re.search(pattern, text) is not None
+
+
+def concept_coverage(question_data, answer):
+    """Returns (fraction of key concepts covered, list of missing concepts as their first keyword)."""
+    concepts = question_data.get("key_concepts") or []
+    text = normalize(answer)
+    missing = [c[0] for c in concepts if not any(keyword_present(k, text) for k in c)]
+    return (1 - len(missing) / len(concepts)) if concepts else 0.0, missing
+
+
+class ReferenceIndex:
+    """TF-IDF vectors for every question's reference answer, used for similarity scoring."""
+
+    def __init__(self, questions):
+        documents = {q["id"]: tokenize(q.get("reference_answer", "")) for q in questions}
+        doc_freq = Counter(t for tokens in documents.values() for t in set(tokens))
+        self.idf = {t: math.log((1 + len(documents)) / (1 + df)) + 1 for t, df in doc_freq.items()}
+        self.vectors = {qid: self._vector(tokens) for qid, tokens in documents.items()}
+
+    def _vector(self, tokens):
+        counts = Counter(tokens)
+        vector = {t: c * self.idf.get(t, 1.0) for t, c in counts.items()}
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        return {t: v / norm for t, v in vector.items()}
+
+    def similarity(self, question_id, answer):
+        reference = self.vectors.get(question_id)
+        if not reference:
+            return 0.0
+        vector = self._vector(tokenize(answer))
+        return sum(weight * reference.get(t, 0.0) for t, weight in vector.items())
+
+
+def score_locally(question_data, answer, index):
+    """Grades clear misses (giving up, or nothing related to the question) without an API call.
+
+    Returns {"score", "feedback", "graded_by": "local"}, or None when the answer
+    is ambiguous and should be escalated to the LLM.
+    """
+    if question_data.get("level") not in LOCAL_SCORING_LEVELS or not question_data.get("key_concepts"):
+        return None
+
+    coverage, missing = concept_coverage(question_data, answer)
+    similarity = index.similarity(question_data["id"], answer)
+
+    if coverage == 0 and (similarity < NO_COVERAGE_SIMILARITY or GIVING_UP_PATTERN.search(normalize(answer))):
+        return {
+            "score": 1,
+            "feedback": f"This answer did not address the question. A complete answer would cover: {', '.join(missing)}.",
+            "graded_by": "local",
+        }
+    return None
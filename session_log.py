@@ -0,0 +1,125 @@
+# session_log.py
+import json
+import threading
+import time
+
+import database
+from database import CLOSING_EVENTS
+from metrics import timed
+
+
+class SessionLog:
+    """Append-only, per-session event log of in-progress interviews.
+
+    append() only buffers the event; a background thread writes the buffer in one
+    transaction every flush_interval seconds (or sooner once batch_size events are
+    waiting), so logging a step costs no disk I/O on the script thread. A crash
+    loses at most the last flush_interval seconds of events.
+    """
+
+    def __init__(self, flush_interval=0.5, batch_size=64):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self.events_written = 0
+        self.flushes = 0
+        threading.Thread(target=self._flush_loop, daemon=True).start()
+
+    def append(self, session_id, userid, kind, payload):
+        """Buffers one event. Safe to call from any thread."""
+        row = (session_id, userid, kind, json.dumps(payload), time.time())
+        with self._lock:
+            self._buffer.append(row)
+            if len(self._buffer) >= self.batch_size:
+                self._wake.set()
+
+    def flush(self):
+        """Writes every buffered event now. Returns how many were written."""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._buffer = self._buffer, []
+            if not rows:
+                return 0
+            try:
+                with timed("db_seconds", op="session_log_flush"), database.get_pool().connection() as conn, conn:
+                    conn.executemany(database.INSERT_EVENT_SQL, rows)
+            except Exception as e:
+                # Put them back in front so the next flush retries them in order
+                with self._lock:
+                    self._buffer = rows + self._buffer
+                print(f"Session log flush failed: {e}")
+                return 0
+            self.events_written += len(rows)
+            self.flushes += 1
+            return len(rows)
+
+    def _flush_loop(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def get_stats(self):
+        with self._lock:
+            buffered = len(self._buffer)
+        return {"events_written": self.events_written, "flushes": self.flushes, "buffered": buffered}
+
+
+def find_open_session(userid):
+    """Returns the session_id of the user's most recent unfinished interview, or None."""
+    with database.get_pool().connection() as conn:
+        row = conn.execute(f'''
+            SELECT session_id FROM interview_events
+            WHERE userid = ?
+            GROUP BY session_id
+            HAVING SUM(kind IN {CLOSING_EVENTS}) = 0 AND SUM(kind = 'started') > 0
+            ORDER BY MAX(event_id) DESC
+            LIMIT 1
+        ''', (userid,)).fetchone()
+    return row["session_id"] if row else None
+
+
+def load_events(session_id):
+    """Returns (kind, payload) for every logged event of a session, oldest first."""
+    with database.get_pool().connection() as conn:
+        rows = conn.execute(
+            "SELECT kind, payload FROM interview_events WHERE session_id = ? ORDER BY event_id", (session_id,)
+        ).fetchall()
+    return [(row["kind"], json.loads(row["payload"])) for row in rows]
+
+
+def replay(events):
+    """Rebuilds an interview's state from its events.
+
+    Returns a dict of session state values, plus "pending_answers": the
+    (question_data, answer) pairs that were submitted but never graded.
+    """
+    # Interviews lost before their first progress event resume at the introduction
+    state = {"stage": "BOT_INTRODUCTION", "messages": [], "evaluations": [], "violations": [], "pending_answers": []}
+    answers = {}
+    for kind, payload in events:
+        if kind == "started":
+            state["questions"] = payload["questions"]
+            state["start_time"] = payload["start_time"]
+        elif kind == "message":
+            state["messages"].append({"id": len(state["messages"]), **payload})
+        elif kind == "progress":
+            state.update(payload)
+        elif kind == "answer":
+            answers[payload["question"]["id"]] = payload
+        elif kind == "evaluation":
+            state["evaluations"].append(payload)
+        elif kind == "violation":
+            state["violations"].append(payload)
+    # Evaluations are logged as they finish, which is not always question order
+    answer_order = {question_id: i for i, question_id in enumerate(answers)}
+    state["evaluations"].sort(key=lambda evaluation: answer_order.get(evaluation.get("id"), len(answer_order)))
+    graded = {evaluation.get("id") for evaluation in state["evaluations"]}
+    state["pending_answers"] = [
+        (answer["question"], answer["answer"]) for question_id, answer in answers.items() if question_id not in graded
+    ]
+    state["warning_count"] = len(state["violations"])
+    return state